@@ -5,7 +5,6 @@ Creates PR from previously generated fix
 """
 
 import argparse
-import json
 import logging
 import os
 import sys
@@ -16,6 +15,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.utils.github_client import GitHubClient
 from src.agents.pr_creator import PRCreator
+from src.utils.jsonio import read_json
 
 logging.basicConfig(
     level=logging.INFO,
@@ -41,8 +41,7 @@ def main():
         logger.error(f"Fix result not found: {fix_result_path}")
         sys.exit(1)
     
-    with open(fix_result_path, 'r') as f:
-        fix_result = json.load(f)
+    fix_result = read_json(fix_result_path)
     
     # Initialize clients
     github_token = os.environ.get('GITHUB_TOKEN')
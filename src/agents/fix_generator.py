@@ -6,9 +6,17 @@ Generates code fixes based on issue analysis
 import json
 import logging
 import re
-from typing import Dict, Any, List, Optional
+import threading
+from string import Formatter
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 from ..llm.bedrock import BedrockClient
 from ..utils.github_client import GitHubClient
+from ..utils.json_stream import find_json_span
+from ..utils import jsonio
+from ..utils.env import env_int
+from ..utils.fix_cache import FixCache
 from ..prompts import FIX_GENERATION_PROMPT_TEMPLATE
 from ..validators.syntax_validator import SyntaxValidator
 from ..validators.dependency_checker import DependencyChecker
@@ -17,6 +25,101 @@ from ..validators.test_runner import TestRunner
 
 logger = logging.getLogger(__name__)
 
+# Max concurrent GitHub file fetches (override with FIX_GENERATOR_FETCH_WORKERS)
+FETCH_MAX_WORKERS = env_int('FIX_GENERATOR_FETCH_WORKERS', 16)
+
+# Files probed (in priority order) when none of the analysis paths exist
+COMMON_FILES = [
+    'src/index.js',
+    'index.js',
+    'package.json',
+    'src/config/database.js',
+    'config/database.js'
+]
+
+# Package manifests used for dependency checking
+MANIFEST_FILES = ['package.json', 'requirements.txt']
+
+# Prompt size limits for supporting (non-primary) files: files longer than
+# PROMPT_MAX_FILE_LINES keep only their head and tail, and additional files
+# stop being added once the prompt reaches ~PROMPT_TOKEN_BUDGET tokens
+PROMPT_MAX_FILE_LINES = 400
+PROMPT_TOKEN_BUDGET = 50000
+
+# Output token cap for fix generation (tool inputs and old_code/new_code echo whole files)
+MAX_FIX_TOKENS = 8000
+
+# File extension -> fenced code block language
+_LANGUAGE_MAP = {
+    'js': 'javascript',
+    'jsx': 'javascript',
+    'ts': 'typescript',
+    'tsx': 'typescript',
+    'py': 'python',
+    'java': 'java',
+    'go': 'go',
+    'rs': 'rust',
+    'rb': 'ruby',
+    'php': 'php',
+    'json': 'json',
+    'yaml': 'yaml',
+    'yml': 'yaml',
+    'md': 'markdown'
+}
+
+# Issue body parsing: "Service: name" line and the bullet list under "Error Patterns"
+_SERVICE_RE = re.compile(r'Service:([^\n]*)')
+_ERR_BLOCK_RE = re.compile(r'Error Patterns[^\n]*\n((?:(?:[ \t]*-[^\n]*|#[^\n]*|[ \t\r]*)(?:\n|\Z))*)')
+_BULLET_RE = re.compile(r'^[ \t]*-+[ \t]*([^\n]*?)[ \t\r]*$', re.M)
+
+# Shared decoder for scanning JSON objects embedded in LLM responses
+_JSON_DECODER = json.JSONDecoder()
+# Fenced code blocks: ```json is preferred over a bare fence
+_JSON_FENCE_RE = re.compile(r'```json(.*?)```', re.S)
+_CODE_FENCE_RE = re.compile(r'```(.*?)```', re.S)
+
+# FIX_GENERATION_PROMPT_TEMPLATE parsed once into (literal, field, spec, conversion) tuples
+_FIX_PROMPT_PARTS = list(Formatter().parse(FIX_GENERATION_PROMPT_TEMPLATE))
+
+# System prompt for the tool-validated fix generation conversation
+FIX_SYSTEM_PROMPT = """You are an expert software engineer generating code fixes for production incidents.
+
+CRITICAL REQUIREMENTS:
+1. ALWAYS generate unit tests for your fix - this is MANDATORY
+2. Use validation tools to ensure your code works BEFORE returning
+3. **AFTER ALL TOOLS COMPLETE, YOU MUST RETURN THE FIX IN JSON FORMAT** - This is required, not optional
+4. Only return the fix when ALL validation passes
+
+PROCESS TO FOLLOW:
+1. Analyze the issue and generate a fix with surgical changes
+2. Generate unit tests that prove the fix works (REQUIRED - use testing framework like Jest/pytest)
+3. Use validate_syntax tool to check for syntax errors in your code
+4. If syntax errors found, fix them and validate again
+5. Use check_dependencies tool to verify all imports exist - request it in the same turn as validate_syntax (one response can contain several tool calls, covering every file)
+6. If dependencies missing, add them to package.json/requirements.txt in your fix
+7. Use build_code tool to build the project
+8. If build fails, analyze errors and fix them
+9. Use run_tests tool to execute the tests you generated
+10. If tests fail, analyze the failure and fix the code
+11. Repeat validation until all checks pass
+12. **AFTER ALL TOOLS ARE DONE AND VALIDATION PASSES, YOU MUST PROVIDE THE FINAL JSON RESPONSE**
+13. Only return the fix when:
+    ✓ Syntax is valid
+    ✓ All dependencies available
+    ✓ Build succeeds
+    ✓ Tests pass
+
+IMPORTANT:
+- Make minimal, surgical changes - only modify the specific function or block that is broken
+- NEVER remove or rewrite existing API routes, server setup, exports, or unrelated code
+- The old_code field must contain the exact code from the file being replaced
+- The new_code field must contain only the replacement for that specific section
+- Use tools multiple times if needed - your goal is to return a working, tested fix
+- **CRITICAL: After running all validation tools, you MUST provide a text response containing the JSON fix. Do not end your response without providing the JSON.**
+
+Return the fix as a single JSON object in the format given under "Output Format" in the user prompt
+(keys: files_to_modify, files_to_create, summary, confidence, testing_notes) - you MUST return it after tools complete."""
+
 # Tool definitions for LLM
 VALIDATION_TOOLS = [
     {
@@ -86,9 +189,53 @@ VALIDATION_TOOLS = [
     }
 ]
 
+# Tools with no side effects or ordering constraints, safe to run in parallel within a turn
+CONCURRENT_TOOLS = {'validate_syntax', 'check_dependencies'}
+
+
+@lru_cache(maxsize=1024)
+def _detect_language(file_path: str) -> str:
+    """Detect programming language from file extension"""
+    return _LANGUAGE_MAP.get(file_path.rpartition('.')[2].lower(), 'text')
+
+
+def _static_prompt_prefix() -> str:
+    """Rendered text before the first placeholder of the fix prompt template"""
+    parts = []
+    for literal, field, spec, conversion in _FIX_PROMPT_PARTS:
+        parts.append(literal)
+        if field is not None:
+            break
+    return ''.join(parts)
+
+
+# Instructions before the first placeholder are identical across issues (prompt cache prefix)
+_FIX_PROMPT_STATIC_PREFIX = _static_prompt_prefix()
+
+
+def _render_fix_prompt(**values: Any) -> str:
+    """Render the pre-parsed fix prompt template (equivalent to str.format)"""
+    parts = []
+    for literal, field, spec, conversion in _FIX_PROMPT_PARTS:
+        parts.append(literal)
+        if field is not None:
+            value = values[field]
+            if conversion == 'r':
+                value = repr(value)
+            elif conversion == 's':
+                value = str(value)
+            elif conversion == 'a':
+                value = ascii(value)
+            parts.append(format(value, spec) if spec else str(value))
+    return ''.join(parts)
+
 
 class FixGenerator:
     """Generates code fixes for analyzed issues"""
+
+    # Thread pool shared by all instances for GitHub fan-out, created on first use
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
     
     def __init__(self, github_client: GitHubClient, bedrock_client: BedrockClient):
         """
@@ -107,11 +254,75 @@ class FixGenerator:
         self.build_runner = BuildRunner()
         self.test_runner = TestRunner()
 
+        # Fixes reused across runs for repeated issues (off unless FIX_CACHE_PATH is set)
+        self.fix_cache = FixCache()
+
         # Context for tool execution
         self.repo_full_name = None
         self.branch = None
         self.package_manifest_cache = {}
+
+        # Reads for the current generate_fix run keyed by (repo, path, ref);
+        # None records a missing file so repeated misses don't hit the API
+        self._file_cache: Dict[Tuple[str, str, str], Optional[str]] = {}
+        # Tool calls started while the LLM response is still streaming, by tool_use ID
+        self._early_tool_futures: Dict[str, Future] = {}
+    
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        """Return the shared fetch thread pool, creating it on first use"""
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(
+                        max_workers=FETCH_MAX_WORKERS,
+                        thread_name_prefix='fix-generator-fetch'
+                    )
+        return cls._executor
     
+    def _fetch_files(self, repo_full_name: str, file_paths: List[str], branch: str) -> Dict[str, Optional[str]]:
+        """
+        Read several files at once: one batched GraphQL request, falling back to
+        concurrent per-file reads if the batch call fails.
+
+        Returns:
+            Dict mapping each path to its content, or None if it couldn't be read
+        """
+        try:
+            files = self.github_client.get_files_batch(repo_full_name, file_paths, ref=branch)
+            for file_path, content in files.items():
+                self._file_cache[(repo_full_name, file_path, branch)] = content
+            return files
+        except Exception as e:
+            logger.warning(f"Batched file read failed, falling back to per-file reads: {e}")
+
+        executor = self._get_executor()
+        futures = {
+            file_path: executor.submit(self._read_file_or_none, repo_full_name, file_path, branch)
+            for file_path in file_paths
+        }
+        return {file_path: future.result() for file_path, future in futures.items()}
+
+    def _read_file_or_none(self, repo_full_name: str, file_path: str, branch: str) -> Optional[str]:
+        """Read a single file (cached per run), returning None if it doesn't exist or can't be read"""
+        key = (repo_full_name, file_path, branch)
+        if key in self._file_cache:
+            return self._file_cache[key]
+
+        try:
+            content = self.github_client.get_file_content(repo_full_name, file_path, ref=branch)
+        except Exception as e:
+            # Check if it's a 404 (file not found) vs other error
+            error_str = str(e)
+            if '404' not in error_str and 'Not Found' not in error_str:
+                # Transient failure - don't remember it
+                logger.warning(f"Failed to read file {file_path}: {e}")
+                return None
+            content = None
+
+        self._file_cache[key] = content
+        return content
+
     def generate_fix(
         self,
         repo_full_name: str,
@@ -134,51 +345,52 @@ class FixGenerator:
         # Set context for tool execution
         self.repo_full_name = repo_full_name
         self.branch = branch
+        self._file_cache.clear()
 
-        # Get affected files content - validate and read in one pass
+        # Fetch affected files, fallback candidates and package manifests in one batch
         affected_files = analysis.get('affected_files', [])
+        # The analysis may list the same file more than once; keep the first occurrence
+        file_paths = list(dict.fromkeys(
+            file_info.get('path') for file_info in affected_files if file_info.get('path')
+        ))
+        prefetched = self._fetch_files(
+            repo_full_name,
+            list(dict.fromkeys(file_paths + COMMON_FILES + MANIFEST_FILES)),
+            branch
+        )
+
+        # Keep the analysis order so the primary file stays first in the prompt
         file_contents = {}
+        for file_path in file_paths:
+            content = prefetched.get(file_path)
+            if content is None:
+                logger.warning(f"File path from analysis does not exist, skipping: {file_path}")
+                continue
+            file_contents[file_path] = content
+            logger.info(f"Successfully loaded file: {file_path}")
 
-        # Read file contents, skipping non-existent files
-        for file_info in affected_files:
-            file_path = file_info.get('path')
-            if file_path:
-                try:
-                    content = self.github_client.get_file_content(repo_full_name, file_path, ref=branch)
-                    file_contents[file_path] = content
-                    logger.info(f"Successfully loaded file: {file_path}")
-                except Exception as e:
-                    # Check if it's a 404 (file not found) vs other error
-                    error_str = str(e)
-                    if '404' in error_str or 'Not Found' in error_str:
-                        logger.warning(f"File path from analysis does not exist, skipping: {file_path}")
-                    else:
-                        logger.warning(f"Failed to read file {file_path}: {e}")
-
-        # If no files found from analysis, try to find common files
+        # If no files found from analysis, fall back to the first common file that exists
         if not file_contents:
             logger.warning("No valid affected files found. Trying to find common files...")
-            common_files = [
-                'src/index.js',
-                'index.js',
-                'package.json',
-                'src/config/database.js',
-                'config/database.js'
-            ]
-
-            # Try common files in order, stop at first success
-            for file_path in common_files:
-                try:
-                    content = self.github_client.get_file_content(repo_full_name, file_path, ref=branch)
+            for file_path in COMMON_FILES:
+                content = prefetched.get(file_path)
+                if content is not None:
                     file_contents[file_path] = content
                     logger.info(f"Found common file: {file_path}")
                     break
-                except Exception as e:
-                    # Skip 404s silently, log other errors
-                    error_str = str(e)
-                    if '404' not in error_str and 'Not Found' not in error_str:
-                        logger.debug(f"Error reading {file_path}: {e}")
-                    continue
+
+        # Parse issue metadata once and hand it to the prompt builder
+        service_name, error_patterns = self._parse_issue_body(analysis.get('issue', {}))
+
+        # Don't spend a Bedrock call when the model would have nothing to work with
+        if not self._has_actionable_context(analysis, file_paths, file_contents, service_name, error_patterns):
+            logger.warning("Analysis has no root cause, error patterns or code context; skipping fix generation")
+            return {
+                'success': False,
+                'error': 'Insufficient analysis to generate a fix: no root cause, error patterns or affected code',
+                'files_to_modify': [],
+                'files_to_create': []
+            }
 
         # If still no files, create a placeholder
         if not file_contents:
@@ -188,82 +400,25 @@ class FixGenerator:
         # Also get package manifest for dependency checking
         self._load_package_manifest(repo_full_name, branch, file_contents)
 
-        # Build fix generation prompt
-        user_prompt = self._build_fix_prompt(analysis, file_contents)
-
-        # Enhanced system prompt for tool use
-        system_prompt = """You are an expert software engineer generating code fixes for production incidents.
-
-CRITICAL REQUIREMENTS:
-1. ALWAYS generate unit tests for your fix - this is MANDATORY
-2. Use validation tools to ensure your code works BEFORE returning
-3. **AFTER ALL TOOLS COMPLETE, YOU MUST RETURN THE FIX IN JSON FORMAT** - This is required, not optional
-4. Only return the fix when ALL validation passes
+        # A repeated issue against unchanged code gets the fix generated last time
+        cached = self.fix_cache.get(repo_full_name, analysis, file_contents)
+        if cached is not None:
+            logger.info("Reusing cached fix for identical analysis and code")
+            # The key covers the current file contents, so the fix still applies;
+            # nothing was validated in this run, though
+            cached['success'] = True
+            cached['validated_with_tools'] = False
+            cached['cache_hit'] = True
+            cached['analysis'] = analysis
+            cached['repo'] = repo_full_name
+            return cached
 
-PROCESS TO FOLLOW:
-1. Analyze the issue and generate a fix with surgical changes
-2. Generate unit tests that prove the fix works (REQUIRED - use testing framework like Jest/pytest)
-3. Use validate_syntax tool to check for syntax errors in your code
-4. If syntax errors found, fix them and validate again
-5. Use check_dependencies tool to verify all imports exist
-6. If dependencies missing, add them to package.json/requirements.txt in your fix
-7. Use build_code tool to build the project
-8. If build fails, analyze errors and fix them
-9. Use run_tests tool to execute the tests you generated
-10. If tests fail, analyze the failure and fix the code
-11. Repeat validation until all checks pass
-12. **AFTER ALL TOOLS ARE DONE AND VALIDATION PASSES, YOU MUST PROVIDE THE FINAL JSON RESPONSE**
-13. Only return the fix when:
-    ✓ Syntax is valid
-    ✓ All dependencies available
-    ✓ Build succeeds
-    ✓ Tests pass
-
-IMPORTANT:
-- Make minimal, surgical changes - only modify the specific function or block that is broken
-- NEVER remove or rewrite existing API routes, server setup, exports, or unrelated code
-- The old_code field must contain the exact code from the file being replaced
-- The new_code field must contain only the replacement for that specific section
-- Use tools multiple times if needed - your goal is to return a working, tested fix
-- **CRITICAL: After running all validation tools, you MUST provide a text response containing the JSON fix. Do not end your response without providing the JSON.**
-
-Use this JSON format (you MUST return this after tools complete):
-{
-  "files_to_modify": [
-    {
-      "path": "file/path",
-      "changes": [
-        {
-          "old_code": "exact code to replace",
-          "new_code": "replacement code",
-          "explanation": "what this change does"
-        }
-      ]
-    }
-  ],
-  "files_to_create": [
-    {
-      "path": "test/file.test.js",
-      "content": "complete test file content",
-      "explanation": "Unit tests proving the fix works"
-    }
-  ],
-  "summary": "Brief description of the fix",
-  "confidence": 95,
-  "testing_notes": "All tests passing (X passed)"
-}"""
+        # Build fix generation prompt
+        user_prompt = self._build_fix_prompt(analysis, file_contents, service_name, error_patterns)
 
         # Call Bedrock with tools
         logger.info("Calling Bedrock with validation tools...")
-        response = self.bedrock_client.invoke_model_with_tools(
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-            tools=VALIDATION_TOOLS,
-            tool_executor=self._execute_tool,
-            max_tokens=8000,
-            temperature=0.2,
-            max_tool_iterations=15  # Allow multiple tool uses
-        )
+        response = self._invoke_with_tools(FIX_SYSTEM_PROMPT, user_prompt)
 
         response_text = self.bedrock_client.get_response_text(response)
         
@@ -310,97 +465,140 @@ Use this JSON format (you MUST return this after tools complete):
 
         logger.info(f"Fix generation complete: {len(fix_result.get('files_to_modify', []))} files to modify")
 
+        self.fix_cache.put(repo_full_name, analysis, file_contents, fix_result)
         return fix_result
     
-    def _build_fix_prompt(self, analysis: Dict[str, Any], file_contents: Dict[str, str]) -> str:
-        """Build the fix generation prompt"""
-        issue = analysis.get('issue', {})
-        
-        # Format file contents
-        files_section = ""
-        for file_path, content in file_contents.items():
-            # Detect language from extension
-            language = self._detect_language(file_path)
-            files_section += f"\n### File: {file_path}\n```{language}\n{content}\n```\n"
-        
-        # Extract error patterns from issue
-        error_patterns = self._extract_error_patterns(issue)
+    def _invoke_with_tools(self, system_prompt: str, user_prompt: str) -> Dict[str, Any]:
+        """
+        Run the tool-validated fix generation conversation.
+        Responses are streamed so stateless tool calls can start before each turn ends;
+        every turn is read to completion, since tool calls may follow the fix JSON.
+        """
+        self._early_tool_futures = {}
+
+        return self.bedrock_client.invoke_model_with_tools(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            tools=VALIDATION_TOOLS,
+            tool_executor=self._execute_tool,
+            max_tokens=MAX_FIX_TOKENS,
+            temperature=0.2,
+            max_tool_iterations=15,  # Allow multiple tool uses
+            performance_config='optimized',
+            batch_tool_executor=self._execute_tools_batch,
+            on_tool_use=self._start_tool_early,
+            prompt_prefix=_FIX_PROMPT_STATIC_PREFIX
+        )
+
+    def _has_actionable_context(
+        self,
+        analysis: Dict[str, Any],
+        file_paths: List[str],
+        file_contents: Dict[str, str],
+        service_name: str,
+        error_patterns: List[str]
+    ) -> bool:
+        """
+        Decide whether the analysis gives the model enough to generate a fix.
+
+        Args:
+            analysis: Issue analysis result
+            file_paths: Affected file paths from the analysis
+            file_contents: Files loaded for the prompt (before any placeholder)
+            service_name: Service name parsed from the issue
+            error_patterns: Error patterns parsed from the issue
+
+        Returns:
+            False when there is no root cause or error pattern and no code to anchor the fix
+        """
+        if analysis.get('root_cause') not in (None, '', 'Unknown') or error_patterns:
+            return True
+
+        no_files = not file_contents
+        no_target = not file_paths and service_name == 'unknown-service'
+        return not (no_files or no_target)
+
+    def _build_fix_prompt(
+        self,
+        analysis: Dict[str, Any],
+        file_contents: Dict[str, str],
+        service_name: Optional[str] = None,
+        error_patterns: Optional[List[str]] = None
+    ) -> str:
+        """Build the fix generation prompt (issue metadata is parsed here if not supplied)"""
+        if service_name is None or error_patterns is None:
+            service_name, error_patterns = self._parse_issue_body(analysis.get('issue', {}))
         
-        # Format the prompt - escape braces in the template first
-        # Replace { with {{ and } with }} except for our actual placeholders
-        template = FIX_GENERATION_PROMPT_TEMPLATE
+        # The primary (first) file is substituted into the template verbatim; the
+        # remaining files are trimmed context, added until the token budget runs out
+        files = iter(file_contents.items())
+        first_path, first_content = next(files, (None, '// No file content available'))
+        budget = PROMPT_TOKEN_BUDGET - len(first_content) // 4
+        additional_parts = []
+        for file_path, content in files:
+            content = self._trim_for_prompt(content)
+            budget -= len(content) // 4
+            if budget < 0:
+                logger.warning(f"Prompt token budget reached, omitting {file_path} and any later files")
+                break
+            additional_parts.append(
+                f"\n### File: {file_path}\n```{self._detect_language(file_path)}\n{content}\n```\n"
+            )
         
-        # Format the prompt with actual values
-        prompt = template.format(
+        # Format the prompt with actual values (template is parsed once at import)
+        prompt = _render_fix_prompt(
             root_cause=analysis.get('root_cause', 'Unknown'),
             affected_component=analysis.get('affected_component', 'Unknown'),
             fix_type=analysis.get('fix_type', 'other'),
             error_patterns=', '.join(error_patterns) if error_patterns else 'N/A',
-            service_name=self._extract_service_name(issue),
-            file_path=list(file_contents.keys())[0] if file_contents else 'unknown',
-            language=self._detect_language(list(file_contents.keys())[0]) if file_contents else 'javascript',
-            file_content=list(file_contents.values())[0] if file_contents else '// No file content available'
+            service_name=service_name,
+            file_path=first_path if first_path is not None else 'unknown',
+            language=self._detect_language(first_path) if first_path is not None else 'javascript',
+            file_content=first_content
         )
         
         # Add all files
-        if len(file_contents) > 1:
-            prompt += "\n\n### Additional Files:\n"
-            for file_path, content in list(file_contents.items())[1:]:
-                language = self._detect_language(file_path)
-                prompt += f"\n### File: {file_path}\n```{language}\n{content}\n```\n"
+        if additional_parts:
+            return ''.join([prompt, "\n\n### Additional Files:\n", *additional_parts])
         
         return prompt
     
+    def _trim_for_prompt(self, content: str, max_lines: int = PROMPT_MAX_FILE_LINES) -> str:
+        """Keep the head and tail of long files, eliding the middle"""
+        lines = content.split('\n')
+        if len(lines) <= max_lines:
+            return content
+
+        keep = max_lines // 2
+        elided = len(lines) - 2 * keep
+        return '\n'.join(lines[:keep] + [f"... <elided {elided} lines> ..."] + lines[-keep:])
+    
     def _detect_language(self, file_path: str) -> str:
         """Detect programming language from file extension"""
-        ext = file_path.split('.')[-1].lower()
-        language_map = {
-            'js': 'javascript',
-            'jsx': 'javascript',
-            'ts': 'typescript',
-            'tsx': 'typescript',
-            'py': 'python',
-            'java': 'java',
-            'go': 'go',
-            'rs': 'rust',
-            'rb': 'ruby',
-            'php': 'php',
-            'json': 'json',
-            'yaml': 'yaml',
-            'yml': 'yaml',
-            'md': 'markdown'
-        }
-        return language_map.get(ext, 'text')
+        return _detect_language(file_path)
+    
+    def _parse_issue_body(self, issue: Dict[str, Any]) -> Tuple[str, List[str]]:
+        """Extract (service_name, error_patterns) from the issue body"""
+        return self._extract_service_name(issue), self._extract_error_patterns(issue)
     
     def _extract_error_patterns(self, issue: Dict[str, Any]) -> List[str]:
         """Extract error patterns from issue body"""
-        body = issue.get('body', '')
-        patterns = []
-        
-        # Look for "Error Patterns" section
-        if 'Error Patterns' in body:
-            in_section = False
-            for line in body.split('\n'):
-                if 'Error Patterns' in line:
-                    in_section = True
-                    continue
-                if in_section and line.strip().startswith('-'):
-                    pattern = line.strip().lstrip('-').strip()
-                    if pattern:
-                        patterns.append(pattern)
-                elif in_section and line.strip() and not line.startswith('#'):
-                    break
-        
-        return patterns
+        body = issue.get('body') or ''
+
+        # Look for the bullet list under the "Error Patterns" section
+        match = _ERR_BLOCK_RE.search(body)
+        if not match:
+            return []
+
+        return [pattern for pattern in _BULLET_RE.findall(match.group(1)) if pattern]
     
     def _extract_service_name(self, issue: Dict[str, Any]) -> str:
         """Extract service name from issue"""
-        body = issue.get('body', '')
+        body = issue.get('body') or ''
         
-        if 'Service:' in body:
-            for line in body.split('\n'):
-                if 'Service:' in line:
-                    return line.split('Service:')[-1].strip()
+        match = _SERVICE_RE.search(body)
+        if match:
+            return match.group(1).split('Service:')[-1].strip()
         
         return 'unknown-service'
     
@@ -473,329 +671,120 @@ Use this JSON format (you MUST return this after tools complete):
                 "success": False
             }
 
-    def _load_package_manifest(
-        self,
-        repo_full_name: str,
-        branch: str,
-        file_contents: Dict[str, str]
-    ):
-        """Load package manifests for dependency checking"""
-        # Check if package.json already in file_contents
-        if 'package.json' in file_contents:
-            self.package_manifest_cache['javascript'] = file_contents['package.json']
-            self.package_manifest_cache['typescript'] = file_contents['package.json']
-        else:
-            # Try to load package.json
-            try:
-                package_json = self.github_client.get_file_content(
-                    repo_full_name, 'package.json', ref=branch
-                )
-                self.package_manifest_cache['javascript'] = package_json
-                self.package_manifest_cache['typescript'] = package_json
-            except Exception:
-                logger.debug("No package.json found")
-
-        # Check if requirements.txt already in file_contents
-        if 'requirements.txt' in file_contents:
-            self.package_manifest_cache['python'] = file_contents['requirements.txt']
-        else:
-            # Try to load requirements.txt
-            try:
-                requirements_txt = self.github_client.get_file_content(
-                    repo_full_name, 'requirements.txt', ref=branch
-                )
-                self.package_manifest_cache['python'] = requirements_txt
-            except Exception:
-                logger.debug("No requirements.txt found")
-
-    def _run_validation_checks(
-        self,
-        fix_result: Dict[str, Any],
-        file_contents: Dict[str, str],
-        repo_full_name: str,
-        branch: str
-    ) -> Dict[str, Any]:
+    def _start_tool_early(self, tool_use_id: str, tool_name: str, tool_input: Dict[str, Any]) -> None:
         """
-        Run validation checks on the generated fix.
-        Returns structured validation results without retrying.
+        Start a stateless check as soon as its tool call has streamed, so it runs
+        while the LLM is still generating the rest of the turn.
 
-        Returns:
-            Dict with 'checks_passed', 'checks_failed', and 'warnings'
+        Args:
+            tool_use_id: ID of the tool_use block
+            tool_name: Name of the tool to execute
+            tool_input: Input parameters for the tool
         """
-        checks_passed = []
-        checks_failed = []
-        warnings = []
+        if tool_name in CONCURRENT_TOOLS:
+            self._early_tool_futures[tool_use_id] = self._get_executor().submit(
+                self._execute_tool, tool_name, tool_input
+            )
 
-        syntax_validator = SyntaxValidator()
-        dependency_checker = DependencyChecker()
-
-        # Simulate applying changes to get final file contents
-        simulated_files = self._simulate_file_changes(fix_result, file_contents, repo_full_name, branch)
-
-        # Check 1: Syntax validation
-        for file_path, content in simulated_files.items():
-            result = syntax_validator.validate(file_path, content)
-
-            if result.get('skipped'):
-                warnings.append(f"Syntax check skipped for {file_path}: {result.get('reason', 'unknown reason')}")
-            elif result.get('valid'):
-                checks_passed.append(f"✓ Syntax valid: {file_path}")
-            else:
-                checks_failed.append(f"✗ Syntax error in {file_path}: {result.get('error', 'Unknown error')}")
+    def _execute_tools_batch(self, calls: List[Tuple[str, str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Execute all tool calls from one LLM turn.
+        Stateless checks (syntax, dependencies) run concurrently, reusing any already
+        started by _start_tool_early; build_code and run_tests run in the order
+        requested, since tests expect a prior build.
 
-        # Check 2: Dependency validation
-        for file_path, content in simulated_files.items():
-            language = syntax_validator._detect_language(file_path)
+        Args:
+            calls: (tool_use_id, tool_name, tool_input) in the order the LLM issued them
 
-            if language == 'unknown':
+        Returns:
+            Tool execution results, in the same order as calls; a call that fails
+            yields an error result without affecting the others
+        """
+        early_futures, self._early_tool_futures = self._early_tool_futures, {}
+        results = [None] * len(calls)
+        futures = {}
+        for index, (tool_use_id, tool_name, tool_input) in enumerate(calls):
+            if tool_name not in CONCURRENT_TOOLS:
                 continue
-
-            # Get package manifest
-            package_content = None
             try:
-                if language == 'python':
-                    try:
-                        package_content = self.github_client.get_file_content(
-                            repo_full_name, 'requirements.txt', ref=branch
-                        )
-                    except:
-                        logger.debug("No requirements.txt found")
-                elif language in ['javascript', 'typescript']:
-                    try:
-                        package_content = self.github_client.get_file_content(
-                            repo_full_name, 'package.json', ref=branch
-                        )
-                    except:
-                        logger.debug("No package.json found")
-
-                if package_content:
-                    missing = dependency_checker.check_dependencies(
-                        content, package_content, language
-                    )
-                    if missing:
-                        checks_failed.append(f"✗ Missing dependencies in {file_path}: {', '.join(missing)}")
-                    else:
-                        checks_passed.append(f"✓ All dependencies available: {file_path}")
-                else:
-                    warnings.append(f"Package manifest not found, skipping dependency check for {file_path}")
-
+                futures[index] = early_futures.get(tool_use_id) or self._get_executor().submit(
+                    self._execute_tool, tool_name, tool_input
+                )
             except Exception as e:
-                logger.warning(f"Dependency check failed for {file_path}: {e}")
-                warnings.append(f"Dependency check failed for {file_path}: {str(e)}")
-
-        # Check 3: Test coverage check
-        files_to_create = fix_result.get('files_to_create', [])
-        has_tests = any(
-            'test' in f.get('path', '').lower() or 'spec' in f.get('path', '').lower()
-            for f in files_to_create
-        )
-        if has_tests:
-            checks_passed.append("✓ Test file included")
-        else:
-            warnings.append("⚠ No test file included in files_to_create")
+                results[index] = self._tool_error_result(tool_name, e)
 
-        # Check 4: Heuristic checks for common issues
-        all_new_code = ''
-        for file_mod in fix_result.get('files_to_modify', []):
-            for change in file_mod.get('changes', []):
-                all_new_code += '\n' + change.get('new_code', '')
+        for index, (tool_use_id, tool_name, tool_input) in enumerate(calls):
+            if tool_name in CONCURRENT_TOOLS:
+                continue
+            try:
+                results[index] = self._execute_tool(tool_name, tool_input)
+            except Exception as e:
+                results[index] = self._tool_error_result(tool_name, e)
 
-        # Check for TODO/FIXME comments that might indicate incomplete work
-        if 'TODO' in all_new_code or 'FIXME' in all_new_code:
-            warnings.append("⚠ Code contains TODO/FIXME comments")
+        for index, future in futures.items():
+            try:
+                results[index] = future.result()
+            except (Exception, CancelledError) as e:
+                results[index] = self._tool_error_result(calls[index][1], e)
 
-        # Check for console.log/print statements (potential debug code)
-        if 'console.log' in all_new_code or re.search(r'\bprint\s*\(', all_new_code):
-            warnings.append("⚠ Code contains console.log/print statements")
+        return results
 
+    def _tool_error_result(self, tool_name: str, error: BaseException) -> Dict[str, Any]:
+        """Error result for one tool call that failed outside _execute_tool"""
+        logger.error(f"Tool {tool_name} failed: {error}")
         return {
-            'checks_passed': checks_passed,
-            'checks_failed': checks_failed,
-            'warnings': warnings,
-            'summary': f"{len(checks_passed)} passed, {len(checks_failed)} failed, {len(warnings)} warnings"
+            "error": str(error) or type(error).__name__,
+            "success": False
         }
 
-    def _simulate_file_changes(
+    def _load_package_manifest(
         self,
-        fix_result: Dict[str, Any],
-        file_contents: Dict[str, str],
         repo_full_name: str,
-        branch: str
-    ) -> Dict[str, str]:
-        """
-        Simulate applying changes to get final file contents for validation.
-
-        Returns:
-            Dict mapping file paths to their final content after applying changes
-        """
-        simulated = {}
-
-        # Handle modified files
-        for file_change in fix_result.get('files_to_modify', []):
-            file_path = file_change.get('path')
-            if not file_path:
-                continue
-
-            # Get current content
-            if file_path in file_contents:
-                current = file_contents[file_path]
-            else:
-                try:
-                    current = self.github_client.get_file_content(
-                        repo_full_name, file_path, ref=branch
-                    )
-                except Exception as e:
-                    logger.warning(f"Could not get content for {file_path}: {e}")
-                    continue
-
-            # Apply changes
-            modified = self._apply_changes_for_simulation(current, file_change.get('changes', []))
-            if modified:
-                simulated[file_path] = modified
-
-        # Handle new files
-        for file_create in fix_result.get('files_to_create', []):
-            file_path = file_create.get('path')
-            content = file_create.get('content', '')
-            if file_path and content:
-                simulated[file_path] = content
-
-        return simulated
-
-    def _refine_with_validation_feedback(
-        self,
-        fix_result: Dict[str, Any],
-        validation_results: Dict[str, Any],
-        file_contents: Dict[str, str],
-        analysis: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """
-        Retry fix generation with structured validation feedback.
-        Uses validation results to guide the LLM to fix specific issues.
-        """
-        checks_failed = validation_results.get('checks_failed', [])
-        warnings = validation_results.get('warnings', [])
-
-        # Build detailed feedback
-        feedback = "## Validation Failures\n\n"
-        feedback += "Your previous fix has the following validation errors that MUST be fixed:\n\n"
-
-        for check in checks_failed:
-            feedback += f"- {check}\n"
-
-        if warnings:
-            feedback += "\n## Warnings\n\n"
-            for warning in warnings:
-                feedback += f"- {warning}\n"
-
-        # Build context
-        fix_json = json.dumps({
-            'files_to_modify': fix_result.get('files_to_modify', []),
-            'files_to_create': fix_result.get('files_to_create', []),
-            'summary': fix_result.get('summary', ''),
-        }, indent=2)
-
-        file_context = ''
-        for path, content in file_contents.items():
-            lang = self._detect_language(path)
-            file_context += f"\n### Current file: {path}\n```{lang}\n{content}\n```\n"
-
-        refinement_prompt = f"""{feedback}
-
-## Your Previous Fix
-```json
-{fix_json}
-```
-
-## Current File Content
-{file_context}
-
-## Instructions
-
-Fix ALL the validation errors above:
-
-1. **Syntax Errors**: Fix any syntax errors in the code. The error messages include line numbers.
-
-2. **Missing Dependencies**:
-   - If a module is missing, add it to the appropriate change entry
-   - For Python: add to requirements.txt or use a built-in alternative
-   - For JavaScript: add to package.json or use a built-in alternative
-   - OR add an import/require statement if the module already exists
-
-3. **Code Quality**:
-   - Remove TODO/FIXME comments - complete the implementation
-   - Remove debug statements (console.log, print) unless needed for production logging
-
-4. **Tests**:
-   - If tests are missing, add a test file with proper syntax
-   - Ensure test files have all required imports
-   - Include test dependencies in the package manifest if needed
-
-Return the COMPLETE corrected fix in JSON format with:
-- All syntax errors fixed
-- All missing dependencies resolved
-- All validation issues addressed
-- The same structure: files_to_modify, files_to_create, summary, confidence, testing_notes
-"""
-
-        logger.info("Calling Bedrock for fix refinement with validation feedback...")
-        response = self.bedrock_client.invoke_model(
-            system_prompt=(
-                "You are an expert software engineer fixing validation errors in a code fix. "
-                "The previous fix had syntax errors, missing dependencies, or other validation issues. "
-                "Fix ALL validation errors while preserving the original fix intent. "
-                "Ensure the code is syntactically correct and all dependencies are available. "
-                "Return the complete corrected fix in JSON format."
-            ),
-            user_prompt=refinement_prompt,
-            max_tokens=8000,
-            temperature=0.2
+        branch: str,
+        file_contents: Dict[str, str]
+    ):
+        """Load package manifests for dependency checking"""
+        # Check if package.json already in file_contents, else read it (cached per run)
+        package_json = file_contents.get('package.json') or self._read_file_or_none(
+            repo_full_name, 'package.json', branch
         )
+        if package_json:
+            self.package_manifest_cache['javascript'] = package_json
+            self.package_manifest_cache['typescript'] = package_json
+        else:
+            logger.debug("No package.json found")
 
-        response_text = self.bedrock_client.get_response_text(response)
-        refined_result = self._parse_fix_response(response_text)
-
-        if refined_result.get('success'):
-            logger.info("Fix refinement successful")
-            return refined_result
+        # Check if requirements.txt already in file_contents, else read it (cached per run)
+        requirements_txt = file_contents.get('requirements.txt') or self._read_file_or_none(
+            repo_full_name, 'requirements.txt', branch
+        )
+        if requirements_txt:
+            self.package_manifest_cache['python'] = requirements_txt
         else:
-            logger.warning("Fix refinement failed to parse, using original fix")
-            return fix_result
+            logger.debug("No requirements.txt found")
 
-    def _apply_changes_for_simulation(self, current_content: str, changes: List[Dict[str, Any]]) -> str:
+    def _decode_fix_object(self, response_text: str) -> Optional[Dict[str, Any]]:
         """
-        Apply changes to simulate final file content.
-        Similar to PR creator's logic but for validation purposes.
-        """
-        if not current_content or not changes:
-            return current_content or ''
-
-        modified_content = current_content
+        Scan the response once with JSONDecoder.raw_decode, returning the first
+        JSON object that looks like a fix (has files_to_modify/files_to_create).
 
-        for change in changes:
-            old_code = change.get('old_code', '')
-            new_code = change.get('new_code', '')
-
-            if not new_code:
+        Returns:
+            Decoded fix dict, or None if no such object is found
+        """
+        idx = response_text.find('{')
+        while idx >= 0:
+            try:
+                obj, end = _JSON_DECODER.raw_decode(response_text, idx)
+            except json.JSONDecodeError:
+                idx = response_text.find('{', idx + 1)
                 continue
 
-            if old_code and old_code.strip() in modified_content:
-                # Surgical replacement
-                modified_content = modified_content.replace(old_code.strip(), new_code.strip(), 1)
-            elif not old_code:
-                # No old_code - check if new_code looks like full file
-                new_lines = new_code.strip().split('\n')
-                has_imports = any(
-                    l.strip().startswith(('import ', 'const ', 'require(', 'from '))
-                    for l in new_lines[:5]
-                )
-                has_structure = len(new_lines) > 10
-
-                if has_imports and has_structure:
-                    # Looks like full file replacement
-                    modified_content = new_code
+            if isinstance(obj, dict) and ('files_to_modify' in obj or 'files_to_create' in obj):
+                return obj
+            # Some other object (e.g. an example) - skip past it, not into it
+            idx = response_text.find('{', end)
 
-        return modified_content
+        return None
 
     def _parse_fix_response(self, response_text: str) -> Dict[str, Any]:
         """Parse Bedrock response into structured fix"""
@@ -808,28 +797,26 @@ Return the COMPLETE corrected fix in JSON format with:
                 'files_to_create': []
             }
         
+        # Fast path: decode the first fix object straight out of the response text
+        fix_result = self._decode_fix_object(response_text)
+        if fix_result is not None:
+            fix_result['success'] = True
+            return fix_result
+        
         try:
-            # Try to extract JSON from response
+            # Fall back to extracting JSON from code fences / outermost braces
             json_str = None
             
             # First, try to find JSON in code blocks
-            if '```json' in response_text:
-                json_start = response_text.find('```json') + 7
-                json_end = response_text.find('```', json_start)
-                if json_end > json_start:
-                    json_str = response_text[json_start:json_end].strip()
-            elif '```' in response_text:
-                json_start = response_text.find('```') + 3
-                json_end = response_text.find('```', json_start)
-                if json_end > json_start:
-                    json_str = response_text[json_start:json_end].strip()
+            fence = _JSON_FENCE_RE.search(response_text) or _CODE_FENCE_RE.search(response_text)
+            if fence:
+                json_str = fence.group(1).strip()
             
-            # If no code block, try to find JSON object directly
+            # If no code block, take the first balanced JSON object directly
             if not json_str:
-                json_start = response_text.find('{')
-                json_end = response_text.rfind('}') + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = response_text[json_start:json_end]
+                span = find_json_span(response_text)
+                if span:
+                    json_str = response_text[span[0]:span[1]]
             
             if not json_str:
                 logger.error("No JSON found in response text")
@@ -842,7 +829,7 @@ Return the COMPLETE corrected fix in JSON format with:
                     'response_preview': response_text[:500] if response_text else 'Empty response'
                 }
             
-            fix_result = json.loads(json_str)
+            fix_result = jsonio.loads(json_str)
             fix_result['success'] = True
             return fix_result
         except json.JSONDecodeError as e:
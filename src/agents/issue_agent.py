@@ -5,7 +5,6 @@ Orchestrates issue analysis, fix generation, and PR creation
 """
 
 import argparse
-import json
 import logging
 import os
 import sys
@@ -14,12 +13,6 @@ from pathlib import Path
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src.llm.bedrock import BedrockClient
-from src.utils.github_client import GitHubClient
-from src.agents.issue_analyzer import IssueAnalyzer
-from src.agents.fix_generator import FixGenerator
-from src.agents.pr_creator import PRCreator
-
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -50,6 +43,15 @@ def main():
         logger.error("GITHUB_TOKEN environment variable not set")
         sys.exit(1)
     
+    # Imported only once arguments and environment are valid: boto3 and PyGithub
+    # take a noticeable share of a cold start, which --help and usage errors don't need
+    from src.llm.bedrock import BedrockClient
+    from src.utils.github_client import GitHubClient
+    from src.agents.issue_analyzer import IssueAnalyzer
+    from src.agents.fix_generator import FixGenerator
+    from src.agents.pr_creator import PRCreator
+    from src.utils.jsonio import write_json
+    
     github_client = GitHubClient(github_token)
     
     bedrock_model = os.environ.get('BEDROCK_MODEL_ID', 'anthropic.claude-3-5-sonnet-20240620-v1:0')
@@ -67,8 +69,7 @@ def main():
         analysis = issue_analyzer.analyze_issue(args.repo, args.issue_number)
         
         # Save analysis
-        with open(output_dir / 'analysis.json', 'w') as f:
-            json.dump(analysis, f, indent=2)
+        write_json(output_dir / 'analysis.json', analysis)
         logger.info(f"Analysis saved to {output_dir / 'analysis.json'}")
         
         # Step 2: Generate fix
@@ -76,8 +77,7 @@ def main():
         fix_result = fix_generator.generate_fix(args.repo, analysis)
         
         # Save fix result
-        with open(output_dir / 'fix_result.json', 'w') as f:
-            json.dump(fix_result, f, indent=2)
+        write_json(output_dir / 'fix_result.json', fix_result)
         logger.info(f"Fix result saved to {output_dir / 'fix_result.json'}")
         
         if not fix_result.get('success'):
@@ -94,8 +94,7 @@ def main():
             )
             
             # Save PR result
-            with open(output_dir / 'pr_result.json', 'w') as f:
-                json.dump(pr_result, f, indent=2)
+            write_json(output_dir / 'pr_result.json', pr_result)
             logger.info(f"PR result saved to {output_dir / 'pr_result.json'}")
             
             if pr_result.get('success'):
@@ -6,13 +6,36 @@ Analyzes GitHub issues to understand the problem and determine fix strategy
 import json
 import logging
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
 from ..llm.bedrock import BedrockClient
 from ..utils.github_client import GitHubClient
+from ..utils.json_stream import JsonObjectScanner
+from ..utils import jsonio
 from ..prompts import ISSUE_ANALYSIS_SYSTEM_PROMPT
 
 logger = logging.getLogger(__name__)
 
+# JSON in an analysis response: a fenced object, else first '{' through last '}'
+_JSON_FENCE_RE = re.compile(r'```(?:json)?\s*(\{.*?\})\s*```', re.S)
+_JSON_OBJECT_RE = re.compile(r'(\{.*\})', re.S)
+
+# First line containing "Service:"; captures the text after its last occurrence
+_SERVICE_RE = re.compile(r'^.*Service:(.*)$', re.M)
+
+# Key every analysis object has; objects without it (e.g. examples in prose) are skipped
+_ANALYSIS_KEY = 'root_cause'
+
+# Directories whose top-level files are listed for the analysis prompt
+COMMON_DIRS = ['src', 'lib', 'app', 'config', 'tests', 'test']
+
+# Analysis prompt size limits, in estimated tokens (~4 characters per token, as
+# for the fix prompt): long issue bodies (pasted logs) keep their head and tail,
+# and the file list stops once its budget is used
+ISSUE_BODY_TOKEN_BUDGET = 20000
+FILE_LIST_TOKEN_BUDGET = 2000
+
 
 class IssueAnalyzer:
     """Analyzes GitHub issues to extract fix requirements"""
@@ -50,19 +73,36 @@ class IssueAnalyzer:
         # Build analysis prompt
         user_prompt = self._build_analysis_prompt(issue, repo_files)
         
-        # Call Bedrock
+        # Call Bedrock, streaming so the analysis JSON is found as it arrives
+        # and the rest of the response (trailing prose) is never waited for
         logger.info("Calling Bedrock for issue analysis...")
-        response = self.bedrock_client.invoke_model(
+        scanner = JsonObjectScanner()
+        json_str = None
+        checked = 0
+        stream = self.bedrock_client.invoke_model_stream(
             system_prompt=ISSUE_ANALYSIS_SYSTEM_PROMPT,
             user_prompt=user_prompt,
             max_tokens=2000,
             temperature=0.2
         )
-        
-        response_text = self.bedrock_client.get_response_text(response)
+        try:
+            for chunk in stream:
+                scanner.feed(chunk)
+                # Check each newly completed object; stop once one is the analysis
+                for start, end in scanner.spans[checked:]:
+                    candidate = scanner.text()[start:end]
+                    if self._is_analysis_json(candidate):
+                        json_str = candidate
+                        break
+                checked = len(scanner.spans)
+                if json_str is not None:
+                    logger.info("Analysis JSON complete, stopping stream")
+                    break
+        finally:
+            stream.close()
         
         # Parse response
-        analysis = self._parse_analysis_response(response_text)
+        analysis = self._parse_analysis_response(scanner.text(), json_str)
         
         # Add issue metadata
         analysis['issue'] = issue
@@ -84,18 +124,56 @@ class IssueAnalyzer:
         Returns:
             List of all files in the repository (up to 50 files)
         """
+        # One recursive tree request covers the root and every common directory
+        try:
+            tree = self.github_client.get_repo_tree(repo_full_name)
+            files_by_dir = {}
+            for f in tree:
+                if f['type'] == 'file':
+                    files_by_dir.setdefault(f['path'].rpartition('/')[0], []).append(f)
+            
+            # Root files first, then each common directory, as the per-directory listing did
+            all_files = []
+            for dir_name in [''] + COMMON_DIRS:
+                all_files.extend(files_by_dir.get(dir_name, []))
+            
+            # Limit to 50 files to avoid token limits
+            return all_files[:50]
+        except Exception as e:
+            logger.debug(f"Recursive tree listing failed, listing directories instead: {e}")
+        
+        return self._list_common_dirs(repo_full_name)
+    
+    def _list_common_dirs(self, repo_full_name: str) -> List[Dict[str, Any]]:
+        """
+        List files at the repository root and in common directories, one listing per directory
+        
+        Args:
+            repo_full_name: Repository name
+            
+        Returns:
+            List of files (up to 50 files)
+        """
         all_files = []
         
+        # Each listing is a separate GitHub round-trip; fetch root and common
+        # directories concurrently, then merge in the original order
+        with ThreadPoolExecutor(max_workers=len(COMMON_DIRS) + 1) as executor:
+            root_future = executor.submit(self.github_client.get_repo_files, repo_full_name)
+            dir_futures = {
+                dir_name: executor.submit(self.github_client.get_repo_files, repo_full_name, path=dir_name)
+                for dir_name in COMMON_DIRS
+            }
+        
         try:
             # Get root level files
-            root_files = self.github_client.get_repo_files(repo_full_name)
+            root_files = root_future.result()
             all_files.extend([f for f in root_files if f['type'] == 'file'])
             
             # Get files from common directories (silently skip if they don't exist)
-            common_dirs = ['src', 'lib', 'app', 'config', 'tests', 'test']
-            for dir_name in common_dirs:
+            for dir_name, future in dir_futures.items():
                 try:
-                    dir_files = self.github_client.get_repo_files(repo_full_name, path=dir_name)
+                    dir_files = future.result()
                     all_files.extend([f for f in dir_files if f['type'] == 'file'])
                 except Exception as e:
                     # Directory doesn't exist (404) - this is expected and not an error
@@ -116,22 +194,26 @@ class IssueAnalyzer:
     
     def _extract_service_name(self, issue: Dict[str, Any]) -> Optional[str]:
         """Extract service name from issue body"""
-        body = issue.get('body', '')
-        
-        # Look for "Service: service-name" pattern
-        if 'Service:' in body:
-            for line in body.split('\n'):
-                if 'Service:' in line:
-                    service = line.split('Service:')[-1].strip()
-                    return service
-        
-        return None
+        # Look for "Service: service-name" on the first line that mentions it
+        match = _SERVICE_RE.search(issue.get('body') or '')
+        return match.group(1).strip() if match else None
     
     def _build_analysis_prompt(self, issue: Dict[str, Any], repo_files: List[Dict[str, Any]]) -> str:
         """Build the analysis prompt with actual repository file structure"""
-        # Build comprehensive file list
+        # Build comprehensive file list, within the token budget
         if repo_files:
-            files_info = "\n".join([f"- {f['path']}" for f in repo_files])
+            lines = []
+            budget = FILE_LIST_TOKEN_BUDGET
+            for f in repo_files:
+                line = f"- {f['path']}"
+                budget -= (len(line) + 1) // 4
+                if budget < 0:
+                    break
+                lines.append(line)
+            if len(lines) < len(repo_files):
+                logger.warning(f"File list token budget reached, omitting {len(repo_files) - len(lines)} files")
+                lines.append(f"- ... {len(repo_files) - len(lines)} more files omitted")
+            files_info = "\n".join(lines)
             files_section = f"""### Actual Repository Files (use ONLY these paths):
 {files_info}
 
@@ -144,7 +226,7 @@ class IssueAnalyzer:
 ## Issue #{issue['number']}: {issue['title']}
 
 ### Issue Body:
-{issue['body']}
+{self._trim_issue_body(issue.get('body') or '')}
 
 {files_section}
 
@@ -156,26 +238,49 @@ class IssueAnalyzer:
 Provide your analysis in the JSON format specified in the system prompt.
 """
     
-    def _parse_analysis_response(self, response_text: str) -> Dict[str, Any]:
-        """Parse Bedrock response into structured analysis"""
+    def _trim_issue_body(self, body: str, max_tokens: int = ISSUE_BODY_TOKEN_BUDGET) -> str:
+        """Keep the head and tail of an issue body that exceeds the token budget"""
+        max_chars = max_tokens * 4
+        if len(body) <= max_chars:
+            return body
+        
+        logger.warning(f"Issue body exceeds ~{max_tokens} tokens, omitting {len(body) - max_chars} characters")
+        half = max_chars // 2
+        return f"{body[:half]}\n\n... [{len(body) - max_chars} characters omitted] ...\n\n{body[-half:]}"
+    
+    def _is_analysis_json(self, json_str: str) -> bool:
+        """Check whether a JSON object string decodes to an analysis (not, say, an example in prose)"""
+        try:
+            obj = jsonio.loads(json_str)
+        except json.JSONDecodeError:
+            return False
+        return isinstance(obj, dict) and _ANALYSIS_KEY in obj
+    
+    def _parse_analysis_response(self, response_text: str, json_str: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Parse Bedrock response into structured analysis
+
+        Args:
+            response_text: Response text
+            json_str: JSON object already located in the response while streaming, if any
+
+        Returns:
+            Analysis dict (a fallback analysis if parsing fails)
+        """
+        if json_str is not None:
+            try:
+                analysis = jsonio.loads(json_str)
+                if isinstance(analysis, dict):
+                    return analysis
+            except json.JSONDecodeError:
+                logger.debug("Streamed JSON object did not parse, falling back to full response")
+        
         try:
-            # Try to extract JSON from response
-            # Look for JSON code block
-            if '```json' in response_text:
-                json_start = response_text.find('```json') + 7
-                json_end = response_text.find('```', json_start)
-                json_str = response_text[json_start:json_end].strip()
-            elif '```' in response_text:
-                json_start = response_text.find('```') + 3
-                json_end = response_text.find('```', json_start)
-                json_str = response_text[json_start:json_end].strip()
-            else:
-                # Try to find JSON object
-                json_start = response_text.find('{')
-                json_end = response_text.rfind('}') + 1
-                json_str = response_text[json_start:json_end]
+            # Prefer a fenced block (```json or bare ```), else the outermost braces
+            match = _JSON_FENCE_RE.search(response_text) or _JSON_OBJECT_RE.search(response_text)
+            json_str = match.group(1) if match else ''
             
-            analysis = json.loads(json_str)
+            analysis = jsonio.loads(json_str)
             return analysis
         except Exception as e:
             logger.error(f"Failed to parse analysis response: {e}")
@@ -3,13 +3,26 @@ PR Creator
 Creates Pull Requests with generated fixes
 """
 
+import difflib
 import logging
-import os
-from typing import Dict, Any, List
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
 from ..utils.github_client import GitHubClient
 
 logger = logging.getLogger(__name__)
 
+# Max concurrent GitHub reads while preparing file updates; GitHub advises
+# keeping concurrent requests low to avoid secondary rate limits
+LOOKUP_MAX_WORKERS = 10
+
+# Minimum similarity between old_code and a file block for an approximate
+# (whitespace-insensitive) replacement; lower-scoring blocks are left alone
+APPROX_MATCH_MIN_RATIO = 0.8
+
+# "Incident: <id>" or "Incident ID: <id>" in an issue body
+_INCIDENT_RE = re.compile(r'Incident(?: ID)?:\s*([a-z0-9-.:]+)', re.IGNORECASE)
+
 
 class PRCreator:
     """Creates Pull Requests with code fixes"""
@@ -51,8 +64,8 @@ class PRCreator:
         branch_name = f"{branch_prefix}-{issue_number}"
         
         try:
-            # Create branch (force delete if exists from previous run)
-            self.github_client.create_branch(repo_full_name, branch_name, force=True)
+            # Create branch (force delete if exists from previous run); it starts at main's head
+            base_sha = self.github_client.create_branch(repo_full_name, branch_name, force=True)
             
             # Apply file changes
             files_modified = []
@@ -60,57 +73,48 @@ class PRCreator:
             
             # Group changes by file path to avoid multiple updates to same file
             files_to_update = {}
+            seen_changes = set()
             for file_change in fix_result.get('files_to_modify', []):
                 file_path = file_change.get('path')
                 if not file_path:
                     continue
                 
-                # Collect all changes for this file
-                if file_path not in files_to_update:
-                    files_to_update[file_path] = []
-                files_to_update[file_path].extend(file_change.get('changes', []))
-            
-            # Modify existing files (one update per file)
-            for file_path, changes in files_to_update.items():
-                # Get current file content and SHA
-                sha = None
-                current_content = None
-
-                # Try branch first, then main
-                for ref in [branch_name, 'main']:
-                    try:
-                        repo_files = self.github_client.get_repo_files(repo_full_name, os.path.dirname(file_path) or '.', ref=ref)
-                        current_file = next((f for f in repo_files if f['path'] == file_path), None)
-                        if current_file:
-                            sha = current_file.get('sha')
-                            break
-                    except Exception:
+                # Collect all changes for this file, dropping repeats of an identical
+                # change (applying one twice would duplicate code that new_code adds)
+                # and changes without new_code, which have nothing to apply
+                changes = files_to_update.setdefault(file_path, [])
+                for change in file_change.get('changes', []):
+                    if not change.get('new_code'):
+                        continue
+                    key = (file_path, change.get('old_code', ''), change.get('new_code', ''))
+                    if key in seen_changes:
+                        logger.info(f"Skipping duplicate change for {file_path}")
                         continue
+                    seen_changes.add(key)
+                    changes.append(change)
+            
+            # Files left without changes don't need to be read or committed
+            for file_path in [p for p, changes in files_to_update.items() if not changes]:
+                logger.warning(f"No applicable changes for {file_path}, skipping")
+                del files_to_update[file_path]
+            
+            # Read current contents for all files up front, in one batch, at the commit
+            # the branch was just created from
+            current_contents = self._read_current_files(repo_full_name, list(files_to_update), base_sha)
 
-                # Read the current file content so we can apply changes surgically
-                try:
-                    current_content = self.github_client.get_file_content(repo_full_name, file_path, ref=branch_name)
-                except Exception:
-                    try:
-                        current_content = self.github_client.get_file_content(repo_full_name, file_path, ref='main')
-                    except Exception:
-                        current_content = None
+            # Collect every new file version, then write them all in one commit
+            files_to_commit = {}
+            commit_notes = []
 
+            # Modify existing files
+            for file_path, changes in files_to_update.items():
                 # Apply changes surgically using old_code/new_code replacement
-                new_content = self._apply_changes(current_content, changes)
+                new_content = self._apply_changes(current_contents.get(file_path), changes)
 
                 if new_content:
                     explanations = [c.get('explanation', '') for c in changes if c.get('explanation')]
-                    commit_message = f"Fix: {', '.join(explanations) if explanations else 'Apply fix'}"
-
-                    self.github_client.create_or_update_file(
-                        repo_full_name,
-                        file_path,
-                        new_content,
-                        branch_name,
-                        commit_message,
-                        sha
-                    )
+                    files_to_commit[file_path] = new_content
+                    commit_notes.append(f"- {file_path}: {', '.join(explanations) if explanations else 'Apply fix'}")
                     files_modified.append(file_path)
             
             # Create new files
@@ -118,15 +122,18 @@ class PRCreator:
                 file_path = file_create.get('path')
                 content = file_create.get('content', '')
                 if file_path and content:
-                    commit_message = f"Add: {file_create.get('explanation', 'New file')}"
-                    self.github_client.create_or_update_file(
-                        repo_full_name,
-                        file_path,
-                        content,
-                        branch_name,
-                        commit_message
-                    )
+                    files_to_commit[file_path] = content
+                    commit_notes.append(f"- {file_path}: {file_create.get('explanation', 'New file')}")
                     files_created.append(file_path)
+
+            if files_to_commit:
+                commit_message = f"Fix: {fix_result.get('summary') or f'Issue #{issue_number}'}\n\n" + '\n'.join(commit_notes)
+                self.github_client.create_commit_with_files(
+                    repo_full_name,
+                    branch_name,
+                    files_to_commit,
+                    commit_message
+                )
             
             # Create PR
             pr_title = f"Fix: {issue.get('title', f'Issue #{issue_number}')}"
@@ -178,6 +185,39 @@ class PRCreator:
                 'error': str(e)
             }
     
+    def _read_current_files(self, repo_full_name: str, file_paths: List[str], ref: str) -> Dict[str, Optional[str]]:
+        """
+        Read the current content of the files to update
+
+        Args:
+            repo_full_name: Repository name (org/repo)
+            file_paths: Paths of files to update
+            ref: Commit SHA (or branch) the fix branch starts from
+
+        Returns:
+            Dict mapping each path to its content, or None if it doesn't exist or couldn't be read
+        """
+        if not file_paths:
+            return {}
+
+        try:
+            # A None here means the file isn't in that commit - no need to look again
+            return self.github_client.get_files_batch(repo_full_name, file_paths, ref=ref)
+        except Exception as e:
+            logger.warning(f"Batched file read failed, falling back to per-file reads: {e}")
+
+        def read(file_path: str) -> Optional[str]:
+            # main is only a last resort if reading at the branch point fails
+            for candidate in [ref, 'main']:
+                try:
+                    return self.github_client.get_file_content(repo_full_name, file_path, ref=candidate)
+                except Exception:
+                    continue
+            return None
+
+        with ThreadPoolExecutor(max_workers=min(LOOKUP_MAX_WORKERS, len(file_paths))) as executor:
+            return dict(zip(file_paths, executor.map(read, file_paths)))
+
     def _apply_changes(self, current_content: str, changes: List[Dict[str, Any]]) -> str:
         """
         Apply code changes surgically to preserve existing file structure.
@@ -201,41 +241,66 @@ class PRCreator:
 
         modified_content = current_content
 
+        # Lines of modified_content and their whitespace-normalized forms, for
+        # approximate matching; built on first use and kept in step with edits
+        content_lines = None
+        normalized_lines = None
+
         for change in changes:
-            old_code = change.get('old_code', '')
-            new_code = change.get('new_code', '')
+            # Whitespace-only old_code counts as none (it would match at the start of the file)
+            old_code = (change.get('old_code') or '').strip()
+            new_code = change.get('new_code') or ''
+            stripped_new = new_code.strip()
 
             if not new_code:
                 continue
 
-            if old_code and old_code.strip() in modified_content:
+            # One scan locates old_code for both the check and the replacement
+            index = modified_content.find(old_code) if old_code else -1
+            if index != -1:
                 # Surgical replacement: find old_code and replace with new_code
-                modified_content = modified_content.replace(old_code.strip(), new_code.strip(), 1)
-                logger.info(f"Applied surgical change: replaced {len(old_code)} chars with {len(new_code)} chars")
+                modified_content = modified_content[:index] + stripped_new + modified_content[index + len(old_code):]
+                content_lines = normalized_lines = None
+                logger.info(f"Applied surgical change: replaced {len(old_code)} chars with {len(stripped_new)} chars")
             elif old_code:
                 # old_code not found verbatim — try normalized whitespace match
                 old_normalized = ' '.join(old_code.split())
-                content_lines = modified_content.split('\n')
-                matched = False
-
-                for i, line in enumerate(content_lines):
-                    if old_normalized[:50] in ' '.join(line.split()):
-                        # Found approximate match, try to find the block
-                        old_lines = old_code.strip().split('\n')
-                        if i + len(old_lines) <= len(content_lines):
-                            # Replace the block
-                            content_lines[i:i + len(old_lines)] = new_code.strip().split('\n')
-                            modified_content = '\n'.join(content_lines)
-                            matched = True
-                            logger.info(f"Applied approximate change at line {i + 1}")
+                old_lines = old_code.split('\n')
+                needle = ' '.join(old_lines[0].split())[:50]
+                if content_lines is None:
+                    content_lines = modified_content.split('\n')
+                    normalized_lines = [' '.join(line.split()) for line in content_lines]
+
+                # Lines containing the start of old_code anchor candidate blocks;
+                # replace the block most similar to old_code, if similar enough
+                best_line, best_ratio = None, APPROX_MATCH_MIN_RATIO
+                for i, line in enumerate(normalized_lines):
+                    if needle not in line or i + len(old_lines) > len(content_lines):
+                        continue
+                    block = ' '.join(l for l in normalized_lines[i:i + len(old_lines)] if l)
+                    matcher = difflib.SequenceMatcher(None, block, old_normalized, autojunk=False)
+                    if matcher.quick_ratio() < best_ratio:
+                        continue
+                    ratio = matcher.ratio()
+                    if ratio >= best_ratio:
+                        best_line, best_ratio = i, ratio
+                        if ratio == 1.0:
                             break
 
-                if not matched:
+                if best_line is not None:
+                    # Replace the block
+                    i = best_line
+                    new_lines = stripped_new.split('\n')
+                    content_lines[i:i + len(old_lines)] = new_lines
+                    normalized_lines[i:i + len(old_lines)] = [' '.join(l.split()) for l in new_lines]
+                    modified_content = '\n'.join(content_lines)
+                    logger.info(f"Applied approximate change at line {i + 1} (similarity {best_ratio:.2f})")
+                else:
                     logger.warning(f"old_code not found in file, skipping change: {old_code[:80]}...")
             else:
                 # No old_code provided — check if new_code looks like a full file
                 # (has imports/requires at top and exports at bottom)
-                new_lines = new_code.strip().split('\n')
+                new_lines = stripped_new.split('\n')
                 has_imports = any(
                     l.strip().startswith(('import ', 'const ', 'require(', 'from '))
                     for l in new_lines[:5]
@@ -246,6 +311,7 @@ class PRCreator:
                     # Looks like a full file replacement — use it but log warning
                     logger.warning("No old_code provided and new_code looks like full file, using as replacement")
                     modified_content = new_code
+                    content_lines = normalized_lines = None
                 else:
                     # Partial code without old_code — append or skip
                     logger.warning("No old_code provided and new_code is partial, skipping to avoid corruption")
@@ -273,9 +339,7 @@ class PRCreator:
 
         # If not found in labels, try to extract from issue body
         if not incident_id:
-            issue_body = issue.get('body', '')
-            import re
-            match = re.search(r'Incident(?: ID)?:\s*([a-z0-9-.:]+)', issue_body, re.IGNORECASE)
+            match = _INCIDENT_RE.search(issue.get('body') or '')
             if match:
                 incident_id = match.group(1)
 
@@ -355,21 +419,18 @@ class PRCreator:
 
         if checks_passed:
             section += "**Passed:**\n"
-            for check in checks_passed:
-                section += f"- {check}\n"
+            section += ''.join(f"- {check}\n" for check in checks_passed)
             section += "\n"
 
         if checks_failed:
             section += "**Failed:**\n"
-            for check in checks_failed:
-                section += f"- {check}\n"
+            section += ''.join(f"- {check}\n" for check in checks_failed)
             section += "\n"
             section += "⚠️ **Action Required:** Please address these validation failures before merging.\n\n"
 
         if warnings:
             section += "**Warnings:**\n"
-            for warning in warnings:
-                section += f"- {warning}\n"
+            section += ''.join(f"- {warning}\n" for warning in warnings)
             section += "\n"
 
         return section
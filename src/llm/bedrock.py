@@ -3,15 +3,43 @@ AWS Bedrock Client for Issue Agent
 Reuses patterns from pr-code-review-action
 """
 
-import json
 import logging
+import os
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
+from ..utils import jsonio
+from ..utils.env import env_int
 
 logger = logging.getLogger(__name__)
 
+# Opt in to latency-optimized inference with BEDROCK_LATENCY_OPTIMIZED=1
+LATENCY_OPTIMIZED = os.environ.get('BEDROCK_LATENCY_OPTIMIZED', '').lower() in ('1', 'true', 'yes')
+
+# Keep-alive connection pool for bedrock-runtime; concurrent callers share it (override with BEDROCK_POOL_SIZE)
+POOL_SIZE = env_int('BEDROCK_POOL_SIZE', 32)
+
+# Opt in to prompt caching of static prompt prefixes with BEDROCK_PROMPT_CACHING=1
+PROMPT_CACHING = os.environ.get('BEDROCK_PROMPT_CACHING', '').lower() in ('1', 'true', 'yes')
+
+# ValidationException message fragments (lowercase) that mean latency-optimized
+# inference is what the model/region rejected, rather than the request itself
+_LATENCY_ERROR_TERMS = ('performanceconfig', 'latency')
+
+# ...and fragments that mean prompt caching (cache points) was rejected
+_CACHE_ERROR_TERMS = ('cache_control', 'cachepoint', 'caching')
+
+
+def _is_validation_error_about(error: ClientError, terms: Tuple[str, ...]) -> bool:
+    """Check whether a ClientError is a ValidationException whose message mentions any of terms"""
+    details = error.response.get('Error', {})
+    if details.get('Code', '') != 'ValidationException':
+        return False
+    message = details.get('Message', '').lower()
+    return any(term in message for term in terms)
+
 
 class BedrockClient:
     """Client for AWS Bedrock API with retry logic"""
@@ -26,7 +54,15 @@ class BedrockClient:
         """
         self.region = region
         self.model_id = model_id
-        self.bedrock_runtime = boto3.client('bedrock-runtime', region_name=region)
+        self.bedrock_runtime = boto3.client(
+            'bedrock-runtime',
+            region_name=region,
+            config=Config(max_pool_connections=POOL_SIZE, tcp_keepalive=True)
+        )
+        # Flipped off once the model/region rejects latency-optimized inference
+        self.latency_optimized_supported = True
+        # Flipped off once the model rejects cache_control blocks
+        self.prompt_caching_supported = True
         logger.info(f"Bedrock client initialized: {model_id} in {region}")
     
     def invoke_model(
@@ -37,7 +73,9 @@ class BedrockClient:
         temperature: float = 0.3,
         max_retries: int = 5,
         initial_delay: float = 2.0,
-        max_delay: float = 60.0
+        max_delay: float = 60.0,
+        performance_config: Optional[str] = None,
+        prompt_prefix: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Invoke Bedrock model with retry logic
@@ -50,19 +88,26 @@ class BedrockClient:
             max_retries: Maximum retry attempts
             initial_delay: Initial delay before retry
             max_delay: Maximum delay between retries
+            performance_config: Latency mode ('optimized' or 'standard');
+                only applied when BEDROCK_LATENCY_OPTIMIZED is enabled
+            prompt_prefix: Static leading part of user_prompt, cached together with the
+                system prompt when BEDROCK_PROMPT_CACHING is enabled
             
         Returns:
             Response from Bedrock API
         """
+        system, user_content = self._with_cache_points(
+            system_prompt, user_prompt, prompt_prefix, cache_user_prompt=False
+        )
         request_body = {
             "anthropic_version": "bedrock-2023-05-31",
             "max_tokens": max_tokens,
             "temperature": temperature,
-            "system": system_prompt,
+            "system": system,
             "messages": [
                 {
                     "role": "user",
-                    "content": user_prompt
+                    "content": user_content
                 }
             ]
         }
@@ -71,12 +116,10 @@ class BedrockClient:
         
         for attempt in range(max_retries):
             try:
-                response = self.bedrock_runtime.invoke_model(
-                    modelId=self.model_id,
-                    body=json.dumps(request_body)
-                )
+                response = self._invoke(request_body, performance_config)
                 
-                response_body = json.loads(response['body'].read())
+                response_body = jsonio.loads(response['body'].read())
+                self._log_cache_usage(response_body)
                 return response_body
                 
             except ClientError as e:
@@ -116,7 +159,11 @@ class BedrockClient:
         max_tool_iterations: int = 10,
         max_retries: int = 5,
         initial_delay: float = 2.0,
-        max_delay: float = 60.0
+        max_delay: float = 60.0,
+        performance_config: Optional[str] = None,
+        prompt_prefix: Optional[str] = None,
+        batch_tool_executor: Optional[Callable[[List[Tuple[str, str, Dict[str, Any]]]], List[Any]]] = None,
+        on_tool_use: Optional[Callable[[str, str, Dict[str, Any]], None]] = None
     ) -> Dict[str, Any]:
         """
         Invoke Bedrock model with tool use capability.
@@ -133,18 +180,29 @@ class BedrockClient:
             max_retries: Maximum retry attempts per API call
             initial_delay: Initial delay before retry
             max_delay: Maximum delay between retries
+            performance_config: Latency mode ('optimized' or 'standard');
+                only applied when BEDROCK_LATENCY_OPTIMIZED is enabled
+            prompt_prefix: Static leading part of user_prompt, cached separately from
+                the rest of the prompt when BEDROCK_PROMPT_CACHING is enabled
+            batch_tool_executor: If given, receives all (tool_use_id, tool_name, tool_input)
+                calls of a turn at once and returns their results in order (used instead
+                of tool_executor, so independent tools can run concurrently)
+            on_tool_use: If given, responses are streamed and this is called with
+                (tool_use_id, tool_name, tool_input) as soon as each tool call has
+                fully streamed, before the turn ends
 
         Returns:
             Final response from Bedrock API
         """
-        messages = [{"role": "user", "content": user_prompt}]
+        system, user_content = self._with_cache_points(system_prompt, user_prompt, prompt_prefix)
+        messages = [{"role": "user", "content": user_content}]
 
         for iteration in range(max_tool_iterations):
             request_body = {
                 "anthropic_version": "bedrock-2023-05-31",
                 "max_tokens": max_tokens,
                 "temperature": temperature,
-                "system": system_prompt,
+                "system": system,
                 "messages": messages,
                 "tools": tools
             }
@@ -157,15 +215,16 @@ class BedrockClient:
             
             for attempt in range(max_retries):
                 try:
-                    response = self.bedrock_runtime.invoke_model(
-                        modelId=self.model_id,
-                        body=json.dumps(request_body)
-                    )
-
-                    result = json.loads(response['body'].read())
+                    if on_tool_use:
+                        response = self._invoke(request_body, performance_config, stream=True)
+                        result = self._read_message_stream(response['body'], on_tool_use)
+                    else:
+                        response = self._invoke(request_body, performance_config)
+                        result = jsonio.loads(response['body'].read())
                     stop_reason = result.get('stop_reason')
 
                     logger.info(f"Stop reason: {stop_reason}")
+                    self._log_cache_usage(result)
 
                     # Successfully got response, break out of retry loop
                     break
@@ -211,33 +270,26 @@ class BedrockClient:
                 messages.append({"role": "assistant", "content": result['content']})
 
                 # Execute tools and collect results
-                tool_results = []
-                for tool_use in tool_uses:
-                    tool_name = tool_use['name']
-                    tool_input = tool_use['input']
-                    tool_use_id = tool_use['id']
-
-                    logger.info(f"Executing tool: {tool_name}")
-
-                    # Execute the tool
-                    try:
-                        tool_result = tool_executor(tool_name, tool_input)
-                        tool_results.append({
-                            "type": "tool_result",
-                            "tool_use_id": tool_use_id,
-                            "content": json.dumps(tool_result)
-                        })
-                    except Exception as e:
-                        logger.error(f"Tool execution failed: {e}")
-                        tool_results.append({
-                            "type": "tool_result",
-                            "tool_use_id": tool_use_id,
-                            "content": json.dumps({
-                                "error": str(e),
-                                "success": False
-                            }),
-                            "is_error": True
-                        })
+                if batch_tool_executor:
+                    tool_results = self._execute_tool_batch(tool_uses, batch_tool_executor)
+                else:
+                    tool_results = []
+                    for tool_use in tool_uses:
+                        tool_name = tool_use['name']
+                        tool_input = tool_use['input']
+                        tool_use_id = tool_use['id']
+
+                        logger.info(f"Executing tool: {tool_name}")
+
+                        # Execute the tool
+                        try:
+                            tool_result = tool_executor(tool_name, tool_input)
+                            tool_results.append(self._tool_result_block(tool_use_id, tool_result))
+                        except Exception as e:
+                            logger.error(f"Tool execution failed: {e}")
+                            tool_results.append(self._tool_result_block(
+                                tool_use_id, {"error": str(e), "success": False}, is_error=True
+                            ))
 
                 # Add tool results to messages
                 messages.append({"role": "user", "content": tool_results})
@@ -257,6 +309,341 @@ class BedrockClient:
         logger.warning(f"Max tool iterations ({max_tool_iterations}) reached")
         return result
 
+    def invoke_model_stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int = 4000,
+        temperature: float = 0.3,
+        max_retries: int = 5,
+        initial_delay: float = 2.0,
+        max_delay: float = 60.0,
+        performance_config: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Invoke Bedrock model with a streamed response.
+        Yields text deltas as the model generates them; closing the generator
+        early stops reading the stream.
+
+        Args:
+            system_prompt: System prompt
+            user_prompt: User prompt
+            max_tokens: Maximum tokens to generate
+            temperature: Temperature for generation
+            max_retries: Maximum retry attempts (for opening the stream)
+            initial_delay: Initial delay before retry
+            max_delay: Maximum delay between retries
+            performance_config: Latency mode ('optimized' or 'standard');
+                only applied when BEDROCK_LATENCY_OPTIMIZED is enabled
+
+        Yields:
+            Text chunks from the response
+        """
+        system, user_content = self._with_cache_points(system_prompt, user_prompt, cache_user_prompt=False)
+        request_body = {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "system": system,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": user_content
+                }
+            ]
+        }
+
+        delay = initial_delay
+        response = None
+
+        for attempt in range(max_retries):
+            try:
+                response = self._invoke(request_body, performance_config, stream=True)
+                break
+
+            except ClientError as e:
+                error_code = e.response.get('Error', {}).get('Code', '')
+
+                # Only retry on throttling errors
+                if error_code == 'ThrottlingException' and attempt < max_retries - 1:
+                    logger.warning(
+                        f"Bedrock throttling on stream (attempt {attempt + 1}/{max_retries}): "
+                        f"Retrying in {delay:.1f}s..."
+                    )
+                    time.sleep(delay)
+                    delay = min(delay * 2.0, max_delay)
+                    continue
+                else:
+                    logger.error(f"Bedrock stream invocation failed: {error_code} - {str(e)}")
+                    raise
+
+        if response is None:
+            raise ClientError(
+                {'Error': {'Code': 'MaxRetriesExceeded', 'Message': 'Max retries exceeded'}},
+                'InvokeModelWithResponseStream'
+            )
+
+        stream = response['body']
+        try:
+            for event in stream:
+                chunk = event.get('chunk')
+                if not chunk:
+                    continue
+                data = jsonio.loads(chunk['bytes'])
+                if data.get('type') == 'message_start':
+                    self._log_cache_usage(data.get('message', {}))
+                elif data.get('type') == 'content_block_delta':
+                    delta = data.get('delta', {})
+                    if delta.get('type') == 'text_delta' and delta.get('text'):
+                        yield delta['text']
+        finally:
+            stream.close()
+
+    def _execute_tool_batch(
+        self,
+        tool_uses: List[Dict[str, Any]],
+        batch_tool_executor: Callable[[List[Tuple[str, str, Dict[str, Any]]]], List[Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Run all tool calls from one assistant turn through a batch executor.
+
+        Args:
+            tool_uses: tool_use content blocks from the response
+            batch_tool_executor: Receives [(tool_use_id, tool_name, tool_input), ...], returns results in order
+
+        Returns:
+            tool_result content blocks, one per tool_use
+        """
+        logger.info(f"Executing {len(tool_uses)} tool(s): {', '.join(t['name'] for t in tool_uses)}")
+        try:
+            results = batch_tool_executor(
+                [(tool_use['id'], tool_use['name'], tool_use['input']) for tool_use in tool_uses]
+            )
+            return [
+                self._tool_result_block(tool_use['id'], result)
+                for tool_use, result in zip(tool_uses, results)
+            ]
+        except Exception as e:
+            logger.error(f"Tool execution failed: {e}")
+            return [
+                self._tool_result_block(tool_use['id'], {"error": str(e), "success": False}, is_error=True)
+                for tool_use in tool_uses
+            ]
+
+    def _tool_result_block(self, tool_use_id: str, result: Any, is_error: bool = False) -> Dict[str, Any]:
+        """Build a tool_result content block for the next user message"""
+        block = {
+            "type": "tool_result",
+            "tool_use_id": tool_use_id,
+            "content": jsonio.dumps(result)
+        }
+        if is_error:
+            block["is_error"] = True
+        return block
+
+    def _read_message_stream(
+        self,
+        stream,
+        on_tool_use: Optional[Callable[[str, str, Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Rebuild a Messages API response from InvokeModelWithResponseStream events.
+
+        Args:
+            stream: Event stream from the response body
+            on_tool_use: Called with (tool_use_id, tool_name, tool_input) as each
+                tool_use block completes
+
+        Returns:
+            Response dict with 'content' blocks and 'stop_reason', as InvokeModel returns
+        """
+        message = {'content': [], 'stop_reason': None}
+        blocks = {}
+        parts = {}
+        finished_tool_uses = set()
+
+        try:
+            for event in stream:
+                chunk = event.get('chunk')
+                if not chunk:
+                    continue
+                data = jsonio.loads(chunk['bytes'])
+                event_type = data.get('type')
+
+                if event_type == 'message_start':
+                    message.update(data.get('message', {}))
+                    message['content'] = []
+                elif event_type == 'content_block_start':
+                    index = data['index']
+                    blocks[index] = dict(data['content_block'])
+                    parts[index] = []
+                elif event_type == 'content_block_delta':
+                    index = data['index']
+                    delta = data.get('delta', {})
+                    if delta.get('type') == 'text_delta':
+                        parts[index].append(delta.get('text', ''))
+                    elif delta.get('type') == 'input_json_delta':
+                        parts[index].append(delta.get('partial_json', ''))
+                elif event_type == 'content_block_stop':
+                    index = data['index']
+                    block = blocks.get(index, {})
+                    if block.get('type') == 'tool_use':
+                        input_json = ''.join(parts[index])
+                        block['input'] = jsonio.loads(input_json) if input_json else {}
+                        finished_tool_uses.add(index)
+                        if on_tool_use:
+                            on_tool_use(block['id'], block['name'], block['input'])
+                elif event_type == 'message_delta':
+                    message['stop_reason'] = data.get('delta', {}).get('stop_reason')
+        finally:
+            stream.close()
+
+        for index in sorted(blocks):
+            block = blocks[index]
+            if block.get('type') == 'text':
+                block['text'] = ''.join(parts[index])
+            elif block.get('type') == 'tool_use' and index not in finished_tool_uses:
+                input_json = ''.join(parts[index])
+                block['input'] = jsonio.loads(input_json) if input_json else {}
+            message['content'].append(block)
+
+        return message
+
+    def _invoke(
+        self,
+        request_body: Dict[str, Any],
+        performance_config: Optional[str] = None,
+        stream: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Call bedrock-runtime InvokeModel, requesting latency-optimized inference when enabled.
+        Falls back to standard inference if the model/region rejects it.
+
+        Args:
+            request_body: Anthropic messages request body
+            performance_config: Latency mode ('optimized' or 'standard')
+            stream: Use InvokeModelWithResponseStream instead of InvokeModel
+
+        Returns:
+            Raw InvokeModel response
+        """
+        body = jsonio.dumps(request_body)
+        invoke = (
+            self.bedrock_runtime.invoke_model_with_response_stream if stream
+            else self.bedrock_runtime.invoke_model
+        )
+
+        if performance_config and LATENCY_OPTIMIZED and self.latency_optimized_supported:
+            try:
+                return invoke(
+                    modelId=self.model_id,
+                    body=body,
+                    performanceConfigLatency=performance_config
+                )
+            except ClientError as e:
+                # Other validation errors (oversized prompt, bad tool schema) are the request's fault
+                if not _is_validation_error_about(e, _LATENCY_ERROR_TERMS):
+                    raise
+                logger.warning(
+                    f"Latency-optimized inference not supported for {self.model_id} in {self.region}, "
+                    f"falling back to standard: {str(e)}"
+                )
+                self.latency_optimized_supported = False
+
+        try:
+            return invoke(
+                modelId=self.model_id,
+                body=body
+            )
+        except ClientError as e:
+            # Only a rejection of the cache points themselves is retried without them
+            if not _is_validation_error_about(e, _CACHE_ERROR_TERMS):
+                raise
+            if not self._strip_cache_points(request_body):
+                raise
+            logger.warning(
+                f"Prompt caching not supported for {self.model_id} in {self.region}, "
+                f"retrying without cache points: {str(e)}"
+            )
+            self.prompt_caching_supported = False
+            return invoke(
+                modelId=self.model_id,
+                body=jsonio.dumps(request_body)
+            )
+
+    def _with_cache_points(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        prompt_prefix: Optional[str] = None,
+        cache_user_prompt: bool = True
+    ) -> Tuple[Any, Any]:
+        """
+        Mark prompt cache points when prompt caching is enabled: after the system
+        prompt, after the static prefix of the user prompt (shared across issues),
+        and at the end of the user prompt (re-sent on every tool iteration).
+
+        Args:
+            system_prompt: System prompt
+            user_prompt: User prompt
+            prompt_prefix: Static leading part of user_prompt
+            cache_user_prompt: Also mark the end of the user prompt; only worth it
+                when the same prompt is sent again (tool iterations)
+
+        Returns:
+            (system, user message content) for the request body
+        """
+        if not (PROMPT_CACHING and self.prompt_caching_supported):
+            return system_prompt, user_prompt
+
+        cache_control = {"type": "ephemeral"}
+        system = [{"type": "text", "text": system_prompt, "cache_control": cache_control}]
+        rest_block = {"type": "text", "text": user_prompt}
+        if cache_user_prompt:
+            rest_block["cache_control"] = cache_control
+
+        if prompt_prefix and len(user_prompt) > len(prompt_prefix) and user_prompt.startswith(prompt_prefix):
+            rest_block["text"] = user_prompt[len(prompt_prefix):]
+            user_content = [
+                {"type": "text", "text": prompt_prefix, "cache_control": cache_control},
+                rest_block
+            ]
+        else:
+            user_content = [rest_block]
+
+        return system, user_content
+
+    def _log_cache_usage(self, response: Dict[str, Any]) -> None:
+        """Log prompt cache reads/writes reported in a response's usage, if any"""
+        usage = response.get('usage') or {}
+        cache_read = usage.get('cache_read_input_tokens') or 0
+        cache_write = usage.get('cache_creation_input_tokens') or 0
+        if cache_read or cache_write:
+            logger.info(
+                f"Prompt cache: {cache_read} tokens read, {cache_write} tokens written, "
+                f"{usage.get('input_tokens', 0)} uncached input tokens"
+            )
+
+    def _strip_cache_points(self, request_body: Dict[str, Any]) -> bool:
+        """
+        Remove cache_control markers from a request body in place.
+
+        Returns:
+            True if any marker was removed
+        """
+        blocks = []
+        if isinstance(request_body.get('system'), list):
+            blocks.extend(request_body['system'])
+        for message in request_body.get('messages', []):
+            if isinstance(message.get('content'), list):
+                blocks.extend(message['content'])
+
+        stripped = False
+        for block in blocks:
+            if isinstance(block, dict) and block.pop('cache_control', None) is not None:
+                stripped = True
+        return stripped
+
     def get_response_text(self, response: Dict[str, Any]) -> str:
         """
         Extract text from Bedrock response
@@ -0,0 +1,22 @@
+"""
+Environment Settings
+Reads optional numeric settings from the environment
+"""
+
+import os
+
+
+def env_int(name: str, default: int) -> int:
+    """
+    Read an integer setting from the environment
+
+    Args:
+        name: Environment variable name
+        default: Value used when the variable is unset or empty (as with
+            unset `${{ inputs.* }}` values in workflows)
+
+    Returns:
+        Integer value of the variable, or the default
+    """
+    value = os.environ.get(name, '').strip()
+    return int(value) if value else default
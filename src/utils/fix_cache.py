@@ -0,0 +1,160 @@
+"""
+Fix Cache
+Reuses generated fixes for repeated issues (e.g. flapping alerts) across runs
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Dict, Any, Optional
+from . import jsonio
+from .env import env_int
+
+logger = logging.getLogger(__name__)
+
+# Entries older than this are not reused (override with FIX_CACHE_TTL_SECONDS)
+FIX_CACHE_TTL_SECONDS = env_int('FIX_CACHE_TTL_SECONDS', 24 * 60 * 60)
+
+# Least recently used entries beyond this count are evicted
+FIX_CACHE_MAX_ENTRIES = 256
+
+# Analyses below this confidence are neither looked up nor stored
+FIX_CACHE_MIN_CONFIDENCE = 70
+
+# Fix result fields describing the run that produced it, not the fix itself;
+# they are not stored, and not returned from entries written before that
+_PER_RUN_FIELDS = (
+    'analysis', 'repo', 'success', 'cache_hit',
+    'validated_with_tools', 'validation_results', 'validation_failed'
+)
+
+
+class FixCache:
+    """
+    SQLite-backed cache of successful fix results.
+
+    Entries are keyed on the analysis (root cause, fix type, affected component)
+    plus the exact contents of the files the fix was generated against, so a hit
+    is only returned when the cached old_code still matches the repository.
+    Enabled by pointing FIX_CACHE_PATH at a database file that the workflow
+    persists between runs (e.g. with actions/cache).
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize Fix Cache
+
+        Args:
+            path: SQLite database file; defaults to FIX_CACHE_PATH, caching is off if neither is set
+        """
+        self.path = path or os.environ.get('FIX_CACHE_PATH')
+        if self.path:
+            logger.info(f"Fix cache enabled: {self.path}")
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def get(self, repo_full_name: str, analysis: Dict[str, Any], file_contents: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached fix for this analysis and code
+
+        Args:
+            repo_full_name: Repository name (org/repo)
+            analysis: Issue analysis result
+            file_contents: Map of file paths to the contents the fix would be generated against
+
+        Returns:
+            Cached fix (changes, summary, confidence, ...) without per-run fields
+            such as success or validation status, or None on a miss
+        """
+        if not self._cacheable(analysis):
+            return None
+
+        key = self._key(repo_full_name, analysis, file_contents)
+        try:
+            with closing(self._connect()) as conn, conn:
+                row = conn.execute(
+                    'SELECT fix_result, created_at FROM fixes WHERE key = ?', (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if time.time() - row[1] > FIX_CACHE_TTL_SECONDS:
+                    conn.execute('DELETE FROM fixes WHERE key = ?', (key,))
+                    return None
+                conn.execute('UPDATE fixes SET last_used = ? WHERE key = ?', (time.time(), key))
+                cached = jsonio.loads(row[0])
+                return {k: v for k, v in cached.items() if k not in _PER_RUN_FIELDS}
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Fix cache lookup failed: {e}")
+            return None
+
+    def put(
+        self,
+        repo_full_name: str,
+        analysis: Dict[str, Any],
+        file_contents: Dict[str, str],
+        fix_result: Dict[str, Any]
+    ) -> None:
+        """
+        Store a successful fix result
+
+        Args:
+            repo_full_name: Repository name (org/repo)
+            analysis: Issue analysis result
+            file_contents: Map of file paths to the contents the fix was generated against
+            fix_result: Fix result to cache (per-run fields such as 'analysis' and
+                validation status are not stored)
+        """
+        if not self._cacheable(analysis) or not fix_result.get('success'):
+            return
+
+        key = self._key(repo_full_name, analysis, file_contents)
+        stored = {k: v for k, v in fix_result.items() if k not in _PER_RUN_FIELDS}
+        now = time.time()
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO fixes (key, fix_result, created_at, last_used) VALUES (?, ?, ?, ?)',
+                    (key, jsonio.dumps(stored), now, now)
+                )
+                conn.execute(
+                    'DELETE FROM fixes WHERE created_at < ? OR key NOT IN '
+                    '(SELECT key FROM fixes ORDER BY last_used DESC LIMIT ?)',
+                    (now - FIX_CACHE_TTL_SECONDS, FIX_CACHE_MAX_ENTRIES)
+                )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Fix cache store failed: {e}")
+
+    def _cacheable(self, analysis: Dict[str, Any]) -> bool:
+        """Only cache confident analyses, and only when a cache file is configured"""
+        if not self.enabled:
+            return False
+        try:
+            return float(analysis.get('confidence') or 0) >= FIX_CACHE_MIN_CONFIDENCE
+        except (TypeError, ValueError):
+            return False
+
+    def _key(self, repo_full_name: str, analysis: Dict[str, Any], file_contents: Dict[str, str]) -> str:
+        """Hash of the normalized analysis fields and the exact file contents"""
+        digest = hashlib.sha256()
+        digest.update(repo_full_name.encode('utf-8') + b'\0')
+        for field in ('root_cause', 'fix_type', 'affected_component'):
+            value = ' '.join(str(analysis.get(field) or '').lower().split())
+            digest.update(value.encode('utf-8') + b'\0')
+        for path in sorted(file_contents):
+            digest.update(path.encode('utf-8') + b'\0' + file_contents[path].encode('utf-8') + b'\0')
+        return digest.hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, creating the table on first use"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS fixes ('
+            'key TEXT PRIMARY KEY, fix_result TEXT NOT NULL, '
+            'created_at REAL NOT NULL, last_used REAL NOT NULL)'
+        )
+        return conn
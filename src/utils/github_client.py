@@ -4,12 +4,27 @@ GitHub API Client for Issue Agent
 
 import os
 import logging
-from typing import Dict, Any, Optional, List
-from github import Github
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from github import Github, InputGitTreeElement
 from github.GithubException import GithubException
+from .env import env_int
 
 logger = logging.getLogger(__name__)
 
+# HTTP connection pool size; sized for concurrent file fetches (override with GITHUB_POOL_SIZE)
+POOL_SIZE = env_int('GITHUB_POOL_SIZE', 32)
+
+# Number of (repo, path, ref) file reads kept in memory per client
+FILE_CACHE_SIZE = 256
+
+# GraphQL endpoint (GitHub Actions sets GITHUB_GRAPHQL_URL, including for GHES)
+GRAPHQL_URL = os.environ.get('GITHUB_GRAPHQL_URL', 'https://api.github.com/graphql')
+
 
 class GitHubClient:
     """Client for GitHub API operations"""
@@ -25,7 +40,28 @@ class GitHubClient:
         if not self.token:
             raise ValueError("GitHub token required. Set GITHUB_TOKEN environment variable.")
         
-        self.github = Github(self.token)
+        # Keep-alive pool shared by all calls (gzip is negotiated by requests by default)
+        self.github = Github(self.token, pool_size=POOL_SIZE)
+
+        # Session for GraphQL calls that PyGithub doesn't wrap. PyGithub already
+        # retries REST rate limits; mirror that here with exponential backoff on
+        # 429 and transient 5xx responses. 403 is not retried: it is usually a
+        # permission or SSO failure, which the callers' fallbacks handle at once
+        self.session = requests.Session()
+        self.session.headers.update({'Authorization': f'bearer {self.token}'})
+        retry = Retry(
+            total=3,
+            backoff_factor=1.0,
+            status_forcelist=[429, 502, 503, 504],
+            allowed_methods=['GET', 'POST'],
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        self.session.mount('https://', HTTPAdapter(pool_maxsize=POOL_SIZE, max_retries=retry))
+
+        # Per-client LRU of file reads keyed by (repo, path, ref); errors are not cached
+        self._file_cache: 'OrderedDict[Tuple[str, str, str], str]' = OrderedDict()
+        self._file_cache_lock = threading.Lock()
         logger.info("GitHub client initialized")
     
     def get_issue(self, repo_full_name: str, issue_number: int) -> Dict[str, Any]:
@@ -95,9 +131,41 @@ class GitHubClient:
             # Re-raise to let caller handle (they may want to distinguish 404s)
             raise
     
+    def get_repo_tree(self, repo_full_name: str, ref: str = 'main') -> List[Dict[str, Any]]:
+        """
+        Get the full repository file structure in one recursive tree request
+        
+        Args:
+            repo_full_name: Repository name (org/repo)
+            ref: Branch or commit SHA (default: 'main')
+            
+        Returns:
+            List of file/directory info (same shape as get_repo_files, without 'url')
+            
+        Raises:
+            GithubException: If the ref doesn't exist or other GitHub API error
+            ValueError: If GitHub truncated the listing (very large repositories)
+        """
+        repo = self.github.get_repo(repo_full_name)
+        tree = repo.get_git_tree(ref, recursive=True)
+        if tree.raw_data.get('truncated'):
+            raise ValueError(f"Tree listing for {repo_full_name}@{ref} was truncated")
+        
+        return [
+            {
+                'name': item.path.rpartition('/')[2],
+                'path': item.path,
+                'type': 'file' if item.type == 'blob' else 'dir',
+                'size': item.size or 0,
+                'sha': item.sha
+            }
+            for item in tree.tree
+            if item.type in ('blob', 'tree')
+        ]
+    
     def get_file_content(self, repo_full_name: str, file_path: str, ref: str = 'main') -> str:
         """
-        Get file content
+        Get file content (cached per repo, path and ref)
         
         Args:
             repo_full_name: Repository name (org/repo)
@@ -107,6 +175,88 @@ class GitHubClient:
         Returns:
             File content as string
         """
+        key = (repo_full_name, file_path, ref)
+        with self._file_cache_lock:
+            if key in self._file_cache:
+                self._file_cache.move_to_end(key)
+                return self._file_cache[key]
+        
+        content = self._fetch_file_content(repo_full_name, file_path, ref)
+        self._cache_file_content(key, content)
+        return content
+    
+    def get_files_batch(self, repo_full_name: str, file_paths: List[str], ref: str = 'main') -> Dict[str, Optional[str]]:
+        """
+        Get the content of several files in one GraphQL request
+        
+        Args:
+            repo_full_name: Repository name (org/repo)
+            file_paths: Paths to files
+            ref: Branch or commit SHA
+            
+        Returns:
+            Dict mapping each path to its content, or None if the file doesn't exist
+        """
+        if not file_paths:
+            return {}
+        
+        owner, name = repo_full_name.split('/', 1)
+        variables = {'owner': owner, 'name': name}
+        declarations = []
+        fields = []
+        for i, file_path in enumerate(file_paths):
+            variables[f'e{i}'] = f'{ref}:{file_path}'
+            declarations.append(f', $e{i}: String!')
+            fields.append(f'f{i}: object(expression: $e{i}) {{ ... on Blob {{ text isBinary isTruncated }} }}')
+        query = (
+            f"query($owner: String!, $name: String!{''.join(declarations)}) {{ "
+            f"repository(owner: $owner, name: $name) {{ {' '.join(fields)} }} }}"
+        )
+        
+        try:
+            response = self.session.post(GRAPHQL_URL, json={'query': query, 'variables': variables}, timeout=30)
+            response.raise_for_status()
+            repository = (response.json().get('data') or {}).get('repository')
+            if repository is None:
+                raise ValueError(f"Repository {repo_full_name} not returned by GraphQL")
+        except Exception as e:
+            logger.error(f"Failed to batch-read {len(file_paths)} files from {repo_full_name}: {e}")
+            raise
+        
+        files = {}
+        for i, file_path in enumerate(file_paths):
+            blob = repository.get(f'f{i}')
+            if not blob:
+                # Missing path (or not a file)
+                files[file_path] = None
+            elif blob.get('isBinary') or blob.get('isTruncated') or blob.get('text') is None:
+                # GraphQL doesn't return full text for these, use the REST path
+                try:
+                    files[file_path] = self.get_file_content(repo_full_name, file_path, ref=ref)
+                except Exception:
+                    files[file_path] = None
+            else:
+                files[file_path] = blob['text']
+                self._cache_file_content((repo_full_name, file_path, ref), blob['text'])
+        
+        logger.info(f"Batch-read {sum(1 for c in files.values() if c is not None)}/{len(file_paths)} files from {repo_full_name}")
+        return files
+    
+    def clear_file_cache(self):
+        """Drop cached file contents (call after writing to the repository)"""
+        with self._file_cache_lock:
+            self._file_cache.clear()
+    
+    def _cache_file_content(self, key: Tuple[str, str, str], content: str):
+        """Store a file read, evicting the least recently used entries"""
+        with self._file_cache_lock:
+            self._file_cache[key] = content
+            self._file_cache.move_to_end(key)
+            while len(self._file_cache) > FILE_CACHE_SIZE:
+                self._file_cache.popitem(last=False)
+    
+    def _fetch_file_content(self, repo_full_name: str, file_path: str, ref: str) -> str:
+        """Fetch file content from the GitHub API"""
         try:
             repo = self.github.get_repo(repo_full_name)
             file = repo.get_contents(file_path, ref=ref)
@@ -119,7 +269,7 @@ class GitHubClient:
             logger.error(f"Failed to get file {file_path} from {repo_full_name}: {e}")
             raise
     
-    def create_branch(self, repo_full_name: str, branch_name: str, base_branch: str = 'main', force: bool = False) -> bool:
+    def create_branch(self, repo_full_name: str, branch_name: str, base_branch: str = 'main', force: bool = False) -> str:
         """
         Create a new branch
         
@@ -130,7 +280,7 @@ class GitHubClient:
             force: If True, delete existing branch and recreate
             
         Returns:
-            True if successful
+            Commit SHA the branch points at (the base branch head for a new branch)
         """
         try:
             repo = self.github.get_repo(repo_full_name)
@@ -143,9 +293,9 @@ class GitHubClient:
                     existing_ref.delete()
                     logger.info(f"Deleted existing branch {branch_name}")
                 else:
-                    # Branch exists and we're not forcing - return True (reuse it)
+                    # Branch exists and we're not forcing - reuse it
                     logger.info(f"Branch {branch_name} already exists, reusing it")
-                    return True
+                    return existing_ref.object.sha
             except GithubException:
                 # Branch doesn't exist, proceed with creation
                 pass
@@ -153,8 +303,9 @@ class GitHubClient:
             # Create new branch
             base_ref = repo.get_git_ref(f'heads/{base_branch}')
             repo.create_git_ref(ref=f'refs/heads/{branch_name}', sha=base_ref.object.sha)
+            self.clear_file_cache()
             logger.info(f"Created branch {branch_name} from {base_branch}")
-            return True
+            return base_ref.object.sha
         except GithubException as e:
             logger.error(f"Failed to create branch {branch_name}: {e}")
             raise
@@ -203,12 +354,57 @@ class GitHubClient:
                     branch=branch
                 )
             
+            self.clear_file_cache()
             logger.info(f"Updated file {file_path} in branch {branch}")
             return True
         except GithubException as e:
             logger.error(f"Failed to create/update file {file_path}: {e}")
             raise
     
+    def create_commit_with_files(
+        self,
+        repo_full_name: str,
+        branch: str,
+        files: Dict[str, str],
+        message: str
+    ) -> str:
+        """
+        Create or update several files in a single commit via the Git Data API
+        (tree -> commit -> ref update), instead of one contents-API commit per file.
+        The branch only moves once the commit exists, so a failure leaves it untouched.
+        
+        Args:
+            repo_full_name: Repository name (org/repo)
+            branch: Branch name
+            files: Map of file paths to their full new content
+            message: Commit message
+            
+        Returns:
+            SHA of the new commit
+        """
+        try:
+            repo = self.github.get_repo(repo_full_name)
+            ref = repo.get_git_ref(f'heads/{branch}')
+            parent = repo.get_git_commit(ref.object.sha)
+            
+            # Inline content lets the tree call create the blobs; paths resolve against base_tree
+            tree = repo.create_git_tree(
+                [
+                    InputGitTreeElement(path=file_path, mode='100644', type='blob', content=content)
+                    for file_path, content in files.items()
+                ],
+                base_tree=parent.tree
+            )
+            commit = repo.create_git_commit(message, tree, [parent])
+            ref.edit(commit.sha)
+            
+            self.clear_file_cache()
+            logger.info(f"Committed {len(files)} file(s) to branch {branch}: {commit.sha[:7]}")
+            return commit.sha
+        except GithubException as e:
+            logger.error(f"Failed to commit {len(files)} file(s) to {branch}: {e}")
+            raise
+    
     def create_pull_request(
         self,
         repo_full_name: str,
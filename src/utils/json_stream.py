@@ -0,0 +1,90 @@
+"""
+JSON Stream Scanning
+Finds JSON objects in streamed LLM output without re-parsing the accumulated text
+"""
+
+import re
+from typing import Optional, Tuple
+
+# Characters that affect brace matching in JSON text
+_JSON_STRUCTURAL_RE = re.compile(r'[{}"\\]')
+
+
+class JsonObjectScanner:
+    """Incrementally finds the first complete top-level JSON object in streamed text"""
+
+    def __init__(self):
+        self.chunks = []
+        self.length = 0
+        self.depth = 0
+        # Slice bounds of the first complete object, once found
+        self.start = None
+        self.end = None
+        # Slice bounds of every complete top-level object, in order
+        self.spans = []
+        # Start of the object currently open at depth 0
+        self.open_start = None
+        self.in_string = False
+        # Absolute index of the character consumed by a pending backslash escape
+        self.escaped_pos = -1
+
+    def feed(self, text: str) -> Optional[str]:
+        """
+        Consume the next chunk of text. The whole chunk is scanned, so objects
+        closing later in it (or in later chunks) are still tracked in spans.
+
+        Returns:
+            The first JSON object substring, from the call in which its closing
+            brace arrives; None before that and on every later call
+        """
+        offset = self.length
+        self.chunks.append(text)
+        self.length += len(text)
+        found = None
+
+        # Jump between structural characters only; everything else is skipped in C
+        for match in _JSON_STRUCTURAL_RE.finditer(text):
+            pos = offset + match.start()
+            ch = match.group()
+            if self.in_string:
+                if pos == self.escaped_pos:
+                    continue
+                if ch == '\\':
+                    self.escaped_pos = pos + 1
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                # Only track strings inside the object; prose quotes are ignored
+                if self.depth:
+                    self.in_string = True
+            elif ch == '{':
+                if self.depth == 0:
+                    self.open_start = pos
+                self.depth += 1
+            elif ch == '}' and self.depth:
+                self.depth -= 1
+                if self.depth == 0:
+                    self.spans.append((self.open_start, pos + 1))
+                    if self.end is None:
+                        self.start, self.end = self.spans[0]
+                        found = self.text()[self.start:self.end]
+
+        return found
+
+    def text(self) -> str:
+        """Return all text consumed so far"""
+        return ''.join(self.chunks)
+
+
+def find_json_span(text: str) -> Optional[Tuple[int, int]]:
+    """
+    Find the first balanced top-level JSON object in text with a single
+    forward scan.
+
+    Returns:
+        (start, end) slice bounds, or None if no complete object is found
+    """
+    scanner = JsonObjectScanner()
+    if scanner.feed(text) is None:
+        return None
+    return scanner.start, scanner.end
@@ -0,0 +1,80 @@
+"""
+JSON I/O
+Fast JSON encode/decode for the agent pipeline, using orjson when installed
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Union
+
+# Prefer orjson for large payloads (Bedrock bodies, fix results); its
+# JSONDecodeError subclasses json's, so callers can keep catching that
+try:
+    import orjson
+
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def loads(data: Union[str, bytes]) -> Any:
+        """Decode JSON text or bytes"""
+        return orjson.loads(data)
+
+    def dumps(obj: Any) -> str:
+        """Encode to compact JSON"""
+        return orjson.dumps(obj, option=_OPTIONS).decode('utf-8')
+
+    def dumps_indented(obj: Any) -> str:
+        """Encode to JSON indented by two spaces"""
+        return _dumps_indented_bytes(obj).decode('utf-8')
+
+    def _dumps_indented_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=_OPTIONS | orjson.OPT_INDENT_2)
+except ImportError:
+    def loads(data: Union[str, bytes]) -> Any:
+        """Decode JSON text or bytes"""
+        return json.loads(data)
+
+    def dumps(obj: Any) -> str:
+        """Encode to compact JSON"""
+        return json.dumps(obj)
+
+    def dumps_indented(obj: Any) -> str:
+        """Encode to JSON indented by two spaces"""
+        return json.dumps(obj, indent=2)
+
+    def _dumps_indented_bytes(obj: Any) -> bytes:
+        return dumps_indented(obj).encode('utf-8')
+
+
+def read_json(path: Union[str, Path]) -> Any:
+    """
+    Load a JSON file
+
+    Args:
+        path: File to read
+
+    Returns:
+        Decoded JSON value
+    """
+    return loads(Path(path).read_bytes())
+
+
+def write_json(path: Union[str, Path], obj: Any) -> None:
+    """
+    Write a value to a JSON file, indented by two spaces.
+    The document is encoded to bytes in one go, written to a temporary file
+    next to the target and moved into place, so readers never see a partial file.
+
+    Args:
+        path: File to write
+        obj: Value to encode
+    """
+    path = Path(path)
+    data = _dumps_indented_bytes(obj)
+    tmp = path.with_name(path.name + '.tmp')
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
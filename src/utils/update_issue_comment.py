@@ -5,7 +5,6 @@ Adds status comment to issue
 """
 
 import argparse
-import json
 import logging
 import os
 import sys
@@ -15,6 +14,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.utils.github_client import GitHubClient
+from src.utils.jsonio import read_json
 
 logging.basicConfig(
     level=logging.INFO,
@@ -39,8 +39,7 @@ def main():
     
     # Check for analysis
     if (status_dir / 'analysis.json').exists():
-        with open(status_dir / 'analysis.json', 'r') as f:
-            analysis = json.load(f)
+        analysis = read_json(status_dir / 'analysis.json')
         status_comment += f"✅ **Analysis Complete**\n"
         status_comment += f"- Root Cause: {analysis.get('root_cause', 'Unknown')}\n"
         status_comment += f"- Fix Type: {analysis.get('fix_type', 'unknown')}\n"
@@ -48,8 +47,7 @@ def main():
     
     # Check for fix result
     if (status_dir / 'fix_result.json').exists():
-        with open(status_dir / 'fix_result.json', 'r') as f:
-            fix_result = json.load(f)
+        fix_result = read_json(status_dir / 'fix_result.json')
         if fix_result.get('success'):
             status_comment += f"✅ **Fix Generated**\n"
             status_comment += f"- Files to modify: {len(fix_result.get('files_to_modify', []))}\n"
@@ -60,8 +58,7 @@ def main():
     
     # Check for PR result
     if (status_dir / 'pr_result.json').exists():
-        with open(status_dir / 'pr_result.json', 'r') as f:
-            pr_result = json.load(f)
+        pr_result = read_json(status_dir / 'pr_result.json')
         if pr_result.get('success'):
             status_comment += f"✅ **PR Created**\n"
             status_comment += f"- PR: #{pr_result.get('pr_number')} - {pr_result.get('pr_url')}\n\n"
@@ -9,6 +9,7 @@ import os
 import json
 import logging
 from typing import Dict, Any
+from .sandbox_deps import SandboxDependencies
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +17,10 @@ logger = logging.getLogger(__name__)
 class BuildRunner:
     """Runs build in a temporary directory sandbox"""
 
+    def __init__(self):
+        # Dependency installs are shared with other runners and reused per manifest
+        self.dependencies = SandboxDependencies()
+
     def build(self, files: Dict[str, str], build_command: str = None) -> Dict[str, Any]:
         """
         Build code in a temporary directory sandbox
@@ -136,55 +141,5 @@ class BuildRunner:
         return None
 
     def _install_dependencies(self, tmpdir: str, files: Dict[str, str]) -> Dict[str, Any]:
-        """Install dependencies before building"""
-        try:
-            if 'package.json' in files:
-                # Node.js project
-                logger.info("Installing npm dependencies...")
-                result = subprocess.run(
-                    ['npm', 'install', '--legacy-peer-deps'],
-                    cwd=tmpdir,
-                    capture_output=True,
-                    timeout=180,  # 3 minutes for npm install
-                    text=True
-                )
-                return {
-                    "success": result.returncode == 0,
-                    "stdout": result.stdout,
-                    "stderr": result.stderr
-                }
-
-            elif 'requirements.txt' in files:
-                # Python project
-                logger.info("Installing pip dependencies...")
-                result = subprocess.run(
-                    ['pip', 'install', '-r', 'requirements.txt', '--quiet'],
-                    cwd=tmpdir,
-                    capture_output=True,
-                    timeout=180,
-                    text=True
-                )
-                return {
-                    "success": result.returncode == 0,
-                    "stdout": result.stdout,
-                    "stderr": result.stderr
-                }
-
-            # No dependencies to install
-            return {"success": True}
-
-        except subprocess.TimeoutExpired:
-            return {
-                "success": False,
-                "error": "Dependency installation timeout"
-            }
-        except FileNotFoundError:
-            # npm or pip not available
-            logger.warning("Package manager not found, skipping dependency install")
-            return {"success": True, "skipped": True}
-        except Exception as e:
-            logger.error(f"Dependency installation failed: {e}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
+        """Install dependencies before building (reused across runs with the same manifest)"""
+        return self.dependencies.install(tmpdir, files)
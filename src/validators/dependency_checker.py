@@ -10,6 +10,22 @@ from typing import List, Set
 
 logger = logging.getLogger(__name__)
 
+# Match: import X, from X import Y, from X.Y import Z
+_PYTHON_IMPORT_RE = re.compile(
+    r'^\s*(?:import\s+([a-zA-Z0-9_\.]+)|from\s+([a-zA-Z0-9_\.]+)\s+import)',
+    re.MULTILINE
+)
+
+# Match: require('X'), import 'X', import X from 'Y', import { X } from 'Y'
+_JAVASCRIPT_IMPORT_RE = re.compile(
+    r"require\s*\(\s*['\"]([^'\"]+)['\"]\s*\)"
+    r"|import\s+['\"]([^'\"]+)['\"]"
+    r"|import\s+.*?\s+from\s+['\"]([^'\"]+)['\"]"
+)
+
+# Version specifiers in requirements.txt lines
+_VERSION_SPEC_RE = re.compile(r'[=<>!]')
+
 
 class DependencyChecker:
     """Checks if all imports/requires are available"""
@@ -67,37 +83,23 @@ class DependencyChecker:
         imports = set()
 
         if language == 'python':
-            # Match: import X, from X import Y, from X.Y import Z
-            patterns = [
-                r'^\s*import\s+([a-zA-Z0-9_\.]+)',
-                r'^\s*from\s+([a-zA-Z0-9_\.]+)\s+import',
-            ]
-            for pattern in patterns:
-                matches = re.findall(pattern, content, re.MULTILINE)
-                for match in matches:
-                    # Get root module (before first dot)
-                    root_module = match.split('.')[0]
-                    imports.add(root_module)
+            for match in _PYTHON_IMPORT_RE.finditer(content):
+                # Get root module (before first dot)
+                root_module = (match.group(1) or match.group(2)).split('.')[0]
+                imports.add(root_module)
 
         elif language in ['javascript', 'typescript']:
-            # Match: require('X'), import X from 'Y', import { X } from 'Y'
-            patterns = [
-                r"require\s*\(\s*['\"]([^'\"]+)['\"]\s*\)",
-                r"import\s+.*?\s+from\s+['\"]([^'\"]+)['\"]",
-                r"import\s+['\"]([^'\"]+)['\"]",
-            ]
-            for pattern in patterns:
-                matches = re.findall(pattern, content)
-                for match in matches:
-                    # Skip relative imports (./foo, ../bar)
-                    if match.startswith('.'):
-                        continue
-                    # Get root module (before first /)
-                    root_module = match.split('/')[0]
-                    # Handle scoped packages (@org/package)
-                    if root_module.startswith('@') and '/' in match:
-                        root_module = '/'.join(match.split('/')[:2])
-                    imports.add(root_module)
+            for match in _JAVASCRIPT_IMPORT_RE.finditer(content):
+                module = match.group(1) or match.group(2) or match.group(3)
+                # Skip relative imports (./foo, ../bar)
+                if module.startswith('.'):
+                    continue
+                # Get root module (before first /)
+                root_module = module.split('/')[0]
+                # Handle scoped packages (@org/package)
+                if root_module.startswith('@') and '/' in module:
+                    root_module = '/'.join(module.split('/')[:2])
+                imports.add(root_module)
 
         return imports
 
@@ -113,7 +115,7 @@ class DependencyChecker:
                     if not line or line.startswith('#'):
                         continue
                     # Remove version specifiers
-                    module = re.split(r'[=<>!]', line)[0].strip()
+                    module = _VERSION_SPEC_RE.split(line, 1)[0].strip()
                     available.add(module)
 
             elif language in ['javascript', 'typescript']:
@@ -0,0 +1,173 @@
+"""
+Sandbox Dependencies
+Installs sandbox dependencies once per manifest and reuses them across runs
+"""
+
+import atexit
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SandboxDependencies:
+    """
+    Installs project dependencies for build/test sandboxes.
+
+    npm dependencies are installed once per package.json (and lockfile) content
+    into a shared directory and symlinked into each sandbox as node_modules; pip
+    requirements are installed once per requirements.txt content. Successful
+    installs are shared by every BuildRunner/TestRunner in the process, so the
+    LLM's repeated build_code/run_tests calls don't reinstall unchanged
+    dependencies; failed installs are retried on the next call.
+    """
+
+    # Guards _key_locks and _cache_root; never held while installing
+    _lock = threading.Lock()
+    # One lock per manifest hash, so only installs of the same manifest wait on each other
+    _key_locks: Dict[str, threading.Lock] = {}
+    # pip installs share the interpreter's site-packages, so they run one at a time
+    _pip_lock = threading.Lock()
+    _results: Dict[str, Dict[str, Any]] = {}
+    _cache_root: Optional[str] = None
+
+    def install(self, tmpdir: str, files: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Make project dependencies available in a sandbox directory
+
+        Args:
+            tmpdir: Sandbox directory the files were written to
+            files: Map of file paths to contents
+
+        Returns:
+            Install result with success status and output
+        """
+        try:
+            if 'package.json' in files:
+                # Node.js project
+                result = self._install_npm(files)
+                if result['success'] and not result.get('skipped'):
+                    self._link_node_modules(tmpdir, result['node_modules'])
+                return result
+
+            elif 'requirements.txt' in files:
+                # Python project
+                return self._install_pip(tmpdir, files)
+
+            # No dependencies to install
+            return {"success": True}
+
+        except subprocess.TimeoutExpired:
+            return {
+                "success": False,
+                "error": "Dependency installation timeout"
+            }
+        except FileNotFoundError:
+            # npm or pip not available
+            logger.warning("Package manager not found, skipping dependency install")
+            return {"success": True, "skipped": True}
+        except Exception as e:
+            logger.error(f"Dependency installation failed: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    def _install_npm(self, files: Dict[str, str]) -> Dict[str, Any]:
+        """Run npm install for this package.json once, in the shared cache directory"""
+        manifests = {
+            name: files[name]
+            for name in ('package.json', 'package-lock.json', 'npm-shrinkwrap.json')
+            if name in files
+        }
+        key = 'npm-' + self._hash(manifests)
+
+        with self._key_lock(key):
+            if key in self._results:
+                logger.info("Reusing npm dependencies installed for this package.json")
+                return self._results[key]
+
+            install_dir = os.path.join(self._get_cache_root(), key)
+            os.makedirs(install_dir, exist_ok=True)
+            for name, content in manifests.items():
+                with open(os.path.join(install_dir, name), 'w') as f:
+                    f.write(content)
+
+            logger.info("Installing npm dependencies...")
+            result = subprocess.run(
+                ['npm', 'install', '--legacy-peer-deps'],
+                cwd=install_dir,
+                capture_output=True,
+                timeout=180,  # 3 minutes for npm install
+                text=True
+            )
+            install_result = {
+                "success": result.returncode == 0,
+                "stdout": result.stdout,
+                "stderr": result.stderr,
+                "node_modules": os.path.join(install_dir, 'node_modules')
+            }
+            if install_result["success"]:
+                self._results[key] = install_result
+            return install_result
+
+    def _install_pip(self, tmpdir: str, files: Dict[str, str]) -> Dict[str, Any]:
+        """Run pip install for this requirements.txt once per process"""
+        key = 'pip-' + self._hash({'requirements.txt': files['requirements.txt']})
+
+        with self._key_lock(key):
+            if key in self._results:
+                logger.info("Reusing pip dependencies installed for this requirements.txt")
+                return self._results[key]
+
+            logger.info("Installing pip dependencies...")
+            with self._pip_lock:
+                result = subprocess.run(
+                    ['pip', 'install', '-r', 'requirements.txt', '--quiet'],
+                    cwd=tmpdir,
+                    capture_output=True,
+                    timeout=180,
+                    text=True
+                )
+            install_result = {
+                "success": result.returncode == 0,
+                "stdout": result.stdout,
+                "stderr": result.stderr
+            }
+            if install_result["success"]:
+                self._results[key] = install_result
+            return install_result
+
+    def _link_node_modules(self, tmpdir: str, node_modules: str) -> None:
+        """Point the sandbox's node_modules at the shared install"""
+        link = os.path.join(tmpdir, 'node_modules')
+        if os.path.isdir(node_modules) and not os.path.lexists(link):
+            os.symlink(node_modules, link, target_is_directory=True)
+
+    def _hash(self, manifests: Dict[str, str]) -> str:
+        """Content hash of the manifest files that determine the install"""
+        digest = hashlib.sha256()
+        for name in sorted(manifests):
+            digest.update(name.encode('utf-8') + b'\0' + manifests[name].encode('utf-8') + b'\0')
+        return digest.hexdigest()[:16]
+
+    @classmethod
+    def _key_lock(cls, key: str) -> threading.Lock:
+        """Lock serializing installs of one manifest"""
+        with cls._lock:
+            return cls._key_locks.setdefault(key, threading.Lock())
+
+    @classmethod
+    def _get_cache_root(cls) -> str:
+        """Create the shared install directory on first use (removed at exit)"""
+        with cls._lock:
+            if cls._cache_root is None:
+                cls._cache_root = tempfile.mkdtemp(prefix='sandbox-deps-')
+                atexit.register(shutil.rmtree, cls._cache_root, True)
+            return cls._cache_root
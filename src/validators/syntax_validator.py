@@ -11,6 +11,17 @@ from typing import Dict, Any
 
 logger = logging.getLogger(__name__)
 
+# File extension -> language for validators that support it
+_LANGUAGE_MAP = {
+    'py': 'python',
+    'js': 'javascript',
+    'jsx': 'javascript',
+    'ts': 'typescript',
+    'tsx': 'typescript',
+    'mjs': 'javascript',
+    'cjs': 'javascript',
+}
+
 
 class SyntaxValidator:
     """Validates code syntax using AST parsing"""
@@ -134,14 +145,4 @@ class SyntaxValidator:
         if not file_path:
             return 'unknown'
 
-        ext = file_path.split('.')[-1].lower()
-        language_map = {
-            'py': 'python',
-            'js': 'javascript',
-            'jsx': 'javascript',
-            'ts': 'typescript',
-            'tsx': 'typescript',
-            'mjs': 'javascript',
-            'cjs': 'javascript',
-        }
-        return language_map.get(ext, 'unknown')
+        return _LANGUAGE_MAP.get(file_path.rpartition('.')[2].lower(), 'unknown')
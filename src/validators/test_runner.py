@@ -10,13 +10,26 @@ import json
 import re
 import logging
 from typing import Dict, Any, List
+from .sandbox_deps import SandboxDependencies
 
 logger = logging.getLogger(__name__)
 
+# Test file naming conventions (JS/TS *.test.* / *.spec.*, Python test_*.py / *_test.py)
+_TEST_FILE_RE = re.compile(
+    r'.*\.test\.(js|ts|jsx|tsx)$'
+    r'|.*\.spec\.(js|ts|jsx|tsx)$'
+    r'|test_.*\.py$'
+    r'|.*_test\.py$'
+)
+
 
 class TestRunner:
     """Runs tests in a temporary directory sandbox"""
 
+    def __init__(self):
+        # Dependency installs are shared with other runners and reused per manifest
+        self.dependencies = SandboxDependencies()
+
     def run_tests(self, files: Dict[str, str], test_command: str = None) -> Dict[str, Any]:
         """
         Run tests in a temporary directory sandbox
@@ -118,11 +131,12 @@ class TestRunner:
             # Check for specific test files
             test_files = [f for f in files.keys() if self._is_test_file(f)]
             if test_files:
+                package_json = files['package.json'].lower()
                 # Jest
-                if any('jest' in files.get('package.json', '').lower()):
+                if 'jest' in package_json:
                     return f'npx jest {test_files[0]}'
                 # Mocha
-                elif any('mocha' in files.get('package.json', '').lower()):
+                elif 'mocha' in package_json:
                     return f'npx mocha {test_files[0]}'
                 # Generic
                 else:
@@ -140,65 +154,11 @@ class TestRunner:
 
     def _is_test_file(self, file_path: str) -> bool:
         """Check if file is a test file"""
-        test_patterns = [
-            r'.*\.test\.(js|ts|jsx|tsx)$',
-            r'.*\.spec\.(js|ts|jsx|tsx)$',
-            r'test_.*\.py$',
-            r'.*_test\.py$',
-        ]
-        return any(re.match(pattern, file_path) for pattern in test_patterns)
+        return _TEST_FILE_RE.match(file_path) is not None
 
     def _install_dependencies(self, tmpdir: str, files: Dict[str, str]) -> Dict[str, Any]:
-        """Install dependencies before running tests"""
-        try:
-            if 'package.json' in files:
-                # Node.js project
-                logger.info("Installing npm dependencies...")
-                result = subprocess.run(
-                    ['npm', 'install', '--legacy-peer-deps'],
-                    cwd=tmpdir,
-                    capture_output=True,
-                    timeout=180,
-                    text=True
-                )
-                return {
-                    "success": result.returncode == 0,
-                    "stdout": result.stdout,
-                    "stderr": result.stderr
-                }
-
-            elif 'requirements.txt' in files:
-                # Python project
-                logger.info("Installing pip dependencies...")
-                result = subprocess.run(
-                    ['pip', 'install', '-r', 'requirements.txt', '--quiet'],
-                    cwd=tmpdir,
-                    capture_output=True,
-                    timeout=180,
-                    text=True
-                )
-                return {
-                    "success": result.returncode == 0,
-                    "stdout": result.stdout,
-                    "stderr": result.stderr
-                }
-
-            return {"success": True}
-
-        except subprocess.TimeoutExpired:
-            return {
-                "success": False,
-                "error": "Dependency installation timeout"
-            }
-        except FileNotFoundError:
-            logger.warning("Package manager not found, skipping dependency install")
-            return {"success": True, "skipped": True}
-        except Exception as e:
-            logger.error(f"Dependency installation failed: {e}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
+        """Install dependencies before running tests (reused across runs with the same manifest)"""
+        return self.dependencies.install(tmpdir, files)
 
     def _parse_test_summary(self, output: str) -> str:
         """Parse test output to extract summary"""
@@ -12,6 +12,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from src.validators.syntax_validator import SyntaxValidator
 from src.validators.dependency_checker import DependencyChecker
+from src.validators.test_runner import TestRunner
 
 
 def test_syntax_validator():
@@ -138,6 +139,199 @@ const lodash = require('lodash');
     print()
 
 
+def test_test_runner_detection():
+    """Test test command detection from project files"""
+    print("Testing TestRunner command detection...")
+    runner = TestRunner()
+
+    # Test 1: package.json test script wins
+    files = {
+        'package.json': '{"scripts": {"test": "jest"}}',
+        'src/app.test.js': "test('ok', () => {});",
+    }
+    assert runner._detect_test_command(files) == 'npm test'
+    print("✓ npm test script detected")
+
+    # Test 2: No test script - test runner picked from package.json dependencies
+    files = {
+        'package.json': '{"devDependencies": {"Jest": "^29.0.0"}}',
+        'src/app.test.js': "test('ok', () => {});",
+    }
+    command = runner._detect_test_command(files)
+    assert command == 'npx jest src/app.test.js', f"Expected jest, got: {command}"
+
+    files = {
+        'package.json': '{"devDependencies": {"mocha": "^10.0.0"}}',
+        'test/app.spec.ts': "describe('app', () => {});",
+    }
+    command = runner._detect_test_command(files)
+    assert command == 'npx mocha test/app.spec.ts', f"Expected mocha, got: {command}"
+    print("✓ Jest/Mocha detected without a test script")
+
+    # Test 3: Python test files and no tests at all
+    assert runner._detect_test_command({'app.py': '', 'test_app.py': ''}) == 'pytest test_app.py -v'
+    assert runner._detect_test_command({'app.py': ''}) is None
+    print("✓ pytest detected, no command without tests")
+
+    print()
+
+
+def test_json_stream():
+    """Test the streaming JSON object scanner"""
+    from src.utils.json_stream import JsonObjectScanner, find_json_span
+
+    print("Testing JsonObjectScanner...")
+
+    # Test 1: Object split across chunks, with braces and escapes inside strings
+    scanner = JsonObjectScanner()
+    assert scanner.feed('Here is the fix: {"summary": "use {} \\"quoted\\"", ') is None
+    result = scanner.feed('"files_to_modify": []} trailing prose')
+    assert result == '{"summary": "use {} \\"quoted\\"", "files_to_modify": []}', f"Unexpected object: {result}"
+    print("✓ Object split across chunks found")
+
+    # Test 2: Several objects in one chunk, the last still open at the chunk boundary
+    scanner = JsonObjectScanner()
+    assert scanner.feed('ex: {"a": 1} then {"files_to_modify": [{"x": 1}') == '{"a": 1}'
+    assert scanner.feed('], "b": 2}') is None
+    text = scanner.text()
+    objects = [text[start:end] for start, end in scanner.spans]
+    assert objects == ['{"a": 1}', '{"files_to_modify": [{"x": 1}], "b": 2}'], f"Unexpected spans: {objects}"
+    print("✓ Later objects tracked after the first completes")
+
+    # Test 3: One-shot span lookup
+    assert find_json_span('no json here') is None
+    assert find_json_span('x {"a": {"b": "}"}} y') == (2, 19)
+    print("✓ find_json_span returns the first balanced object")
+
+    print()
+
+
+def test_jsonio():
+    """Test JSON file helpers"""
+    import tempfile
+    from src.utils import jsonio
+
+    print("Testing jsonio...")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / 'analysis.json'
+
+        # Test 1: Round trip, no temporary file left behind
+        jsonio.write_json(path, {'summary': 'fix', 'files': ['a.py'], 'confidence': 90})
+        assert jsonio.read_json(path) == {'summary': 'fix', 'files': ['a.py'], 'confidence': 90}
+        assert [p.name for p in Path(tmpdir).iterdir()] == ['analysis.json']
+        print("✓ JSON written and read back")
+
+        # Test 2: A failed write leaves the previous file intact and removes the temporary file
+        original_replace = jsonio.os.replace
+
+        def failing_replace(src, dst):
+            raise OSError("simulated failure")
+
+        jsonio.os.replace = failing_replace
+        try:
+            jsonio.write_json(path, {'summary': 'partial'})
+            assert False, "Expected the write to fail"
+        except OSError:
+            pass
+        finally:
+            jsonio.os.replace = original_replace
+        assert jsonio.read_json(path)['summary'] == 'fix', "Previous file was modified"
+        assert [p.name for p in Path(tmpdir).iterdir()] == ['analysis.json']
+        print("✓ Failed write leaves the previous file in place")
+
+    print()
+
+
+def test_fix_cache():
+    """Test the fix cache key, per-run fields and TTL"""
+    import tempfile
+    from src.utils import fix_cache
+    from src.utils.fix_cache import FixCache
+
+    print("Testing FixCache...")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = FixCache(str(Path(tmpdir) / 'fixes.db'))
+        analysis = {'root_cause': 'Pool  exhausted', 'fix_type': 'config', 'confidence': 90}
+        files = {'src/db.js': 'const pool = 5;'}
+        fix_result = {
+            'success': True,
+            'files_to_modify': [{'path': 'src/db.js', 'changes': []}],
+            'summary': 'Raise pool size',
+            'validated_with_tools': True,
+            'validation_results': {'checks_failed': []},
+            'analysis': analysis,
+        }
+        cache.put('org/repo', analysis, files, fix_result)
+
+        # Test 1: Hit despite case/whitespace differences, per-run fields dropped
+        cached = cache.get('org/repo', dict(analysis, root_cause='pool exhausted '), files)
+        assert cached == {
+            'files_to_modify': [{'path': 'src/db.js', 'changes': []}],
+            'summary': 'Raise pool size',
+        }, f"Unexpected cached fix: {cached}"
+        print("✓ Hit on normalized analysis, without per-run fields")
+
+        # Test 2: Changed code, other repo or low confidence miss
+        assert cache.get('org/repo', analysis, {'src/db.js': 'const pool = 10;'}) is None
+        assert cache.get('org/other', analysis, files) is None
+        assert cache.get('org/repo', dict(analysis, confidence=50), files) is None
+        print("✓ Miss on changed code, repository or low confidence")
+
+        # Test 3: Expired entries are not returned
+        original_ttl = fix_cache.FIX_CACHE_TTL_SECONDS
+        fix_cache.FIX_CACHE_TTL_SECONDS = -1
+        try:
+            assert cache.get('org/repo', analysis, files) is None
+        finally:
+            fix_cache.FIX_CACHE_TTL_SECONDS = original_ttl
+        assert cache.get('org/repo', analysis, files) is None, "Expired entry was not deleted"
+        print("✓ Expired entry dropped")
+
+    print()
+
+
+def test_apply_changes():
+    """Test surgical and approximate change application in PRCreator"""
+    from src.agents.pr_creator import PRCreator
+
+    print("Testing PRCreator._apply_changes...")
+    creator = PRCreator(github_client=None)
+
+    content = """def first():
+    if ready:
+        return 1
+    return 2
+
+def second():
+    if ready:
+            return   3
+    return 4
+"""
+
+    # Test 1: Verbatim old_code is replaced once
+    result = creator._apply_changes(content, [{'old_code': 'return 2', 'new_code': 'return 20'}])
+    assert 'return 20' in result and result.count('return 2') == 1, f"Unexpected result: {result}"
+    print("✓ Verbatim change applied")
+
+    # Test 2: Re-indented old_code replaces the most similar block, not the first anchor line
+    result = creator._apply_changes(content, [{'old_code': 'if ready:\n  return 3\nreturn 4', 'new_code': 'return 5'}])
+    assert result.startswith("def first():\n    if ready:\n        return 1"), f"Wrong block replaced: {result}"
+    assert 'return 5' in result and 'return   3' not in result, f"Block not replaced: {result}"
+    print("✓ Approximate change applied to the most similar block")
+
+    # Test 3: A dissimilar block and whitespace-only old_code leave the file unchanged
+    result = creator._apply_changes(content, [
+        {'old_code': 'if ready:\n    launch_rockets()\n    notify_everyone()', 'new_code': 'pass'},
+        {'old_code': '   ', 'new_code': 'x = 1'},
+    ])
+    assert result == content, f"File changed unexpectedly: {result}"
+    print("✓ Dissimilar or empty old_code skipped")
+
+    print()
+
+
 if __name__ == '__main__':
     print("=" * 60)
     print("VALIDATOR TESTS")
@@ -147,6 +341,11 @@ if __name__ == '__main__':
     try:
         test_syntax_validator()
         test_dependency_checker()
+        test_test_runner_detection()
+        test_json_stream()
+        test_jsonio()
+        test_fix_cache()
+        test_apply_changes()
 
         print("=" * 60)
         print("✅ ALL TESTS PASSED")